@@ -1,6 +1,6 @@
-import asyncio
 import json
 import logging
+from typing import Callable
 
 import httpx
 from aiogram import types
@@ -9,16 +9,50 @@ from httpx import Response
 
 from api.urls import ApiUrls
 from config.configuration import settings
+from services.reference_cache import reference_cache
+from services.sc_detail_cache import sc_detail_cache
+from utils.circuit_breaker import CircuitOpenError, itilium_circuit_breakers
+from utils.fan_out import FanOutResult, fan_out_executor
 from utils.helpers import Helpers
-from utils.http_client import log_and_request
+from utils.http_client import log_and_request, RetryPolicy
+from utils.single_flight import single_flight
 
 logger = logging.getLogger(__name__)
 
 
 class ItiliumBaseApi:
+    # Запросы чтения в Итилиуме отправляются методом POST, но идемпотентны и могут повторяться
+    READ_RETRY_POLICY = RetryPolicy(
+        max_retries=settings.HTTP_MAX_RETRIES,
+        base_delay=settings.HTTP_RETRY_BASE_DELAY,
+        max_delay=settings.HTTP_RETRY_MAX_DELAY,
+        idempotent=True,
+    )
+    # Создание и изменение заявок повторяются только при наличии ключа идемпотентности
+    WRITE_RETRY_POLICY = RetryPolicy(
+        max_retries=settings.HTTP_MAX_RETRIES,
+        base_delay=settings.HTTP_RETRY_BASE_DELAY,
+        max_delay=settings.HTTP_RETRY_MAX_DELAY,
+        idempotent=False,
+    )
+    # Политики повторов по методам ItiliumBaseApi. Методы, которых нет в словаре, используют WRITE_RETRY_POLICY
+    RETRY_POLICIES: dict[str, RetryPolicy] = {
+        "find_employee_by_attribute": READ_RETRY_POLICY,
+        "find_sc_by_id": READ_RETRY_POLICY,
+        "scs_responsibility_tasks": READ_RETRY_POLICY,
+        "get_responsibles": READ_RETRY_POLICY,
+        "get_marketing_services": READ_RETRY_POLICY,
+        "get_marketing_subdivisions": READ_RETRY_POLICY,
+    }
+
     def __init__(self):
         pass
 
+    @staticmethod
+    def retry_policy(method_name: str) -> RetryPolicy:
+        """Политика повторов для метода ItiliumBaseApi"""
+        return ItiliumBaseApi.RETRY_POLICIES.get(method_name, ItiliumBaseApi.WRITE_RETRY_POLICY)
+
     @staticmethod
     def check_response(response_code):
         """
@@ -33,6 +67,7 @@ class ItiliumBaseApi:
             return -1
 
     @staticmethod
+    @single_flight("find_employee")
     async def find_employee_by_attribute(
             identifier: int,
             attribute_code: str = 'telegram'
@@ -42,7 +77,12 @@ class ItiliumBaseApi:
         """
         payload = {attribute_code: identifier}
         logger.info("Делаем запрос в Итилиум find_employee с параметрами: %s", payload)
-        response = await ItiliumBaseApi.send_request("POST", ApiUrls.FIND_EMPLOYEE_URL, payload)
+        response = await ItiliumBaseApi.send_request(
+            "POST",
+            ApiUrls.FIND_EMPLOYEE_URL,
+            payload,
+            retry_policy=ItiliumBaseApi.retry_policy("find_employee_by_attribute")
+        )
         logger.info(
             "Пришел ответ find_employee. Код: %s | Тело: %s",
             response.status_code,
@@ -125,10 +165,14 @@ class ItiliumBaseApi:
             method: str,
             url: str,
             data: dict | None,
-            params=None
+            params=None,
+            retry_policy: RetryPolicy | None = None,
+            idempotency_key: str | None = None
     ) -> Response:
         """
         Базовый метод, обёртка над httpx
+        :param retry_policy: политика повторов (по умолчанию WRITE_RETRY_POLICY)
+        :param idempotency_key: ключ идемпотентности, разрешает повторы создающих запросов
         """
         logger.debug(f"send_request {method} {settings.ITILIUM_URL + url}")
         logger.debug(f"send_request data {data}")
@@ -139,9 +183,15 @@ class ItiliumBaseApi:
                 url=settings.ITILIUM_URL + url,
                 data=data,
                 params=params,
-                auth=(settings.ITILIUM_LOGIN, settings.ITILIUM_PASSWORD)
+                auth=(settings.ITILIUM_LOGIN, settings.ITILIUM_PASSWORD),
+                retry_policy=retry_policy or ItiliumBaseApi.WRITE_RETRY_POLICY,
+                idempotency_key=idempotency_key,
+                circuit_breaker=itilium_circuit_breakers.for_url(url)
             )
             return response
+        except CircuitOpenError as e:
+            logger.warning(f"{method} {url} отклонен: {e}")
+            raise
         except Exception as e:
             logger.debug(f"error for {method} {url} {data}")
             logger.exception(e)
@@ -173,30 +223,94 @@ class ItiliumBaseApi:
         return response
 
     @staticmethod
-    async def find_sc_by_id(telegram_user_id: int, sc_number: str) -> Response | None:
+    async def find_sc_by_id(
+            telegram_user_id: int,
+            sc_number: str,
+            use_cache: bool = True,
+            store: bool = True
+    ) -> dict | None:
+        """
+        Карточка заявки (ответ find_sc). Найденная заявка кэшируется на SC_DETAIL_CACHE_TTL,
+        кэш сбрасывается методами, изменяющими заявку
+        :param use_cache: False - всегда запрашивать Итилиум (ответ все равно сохраняется в кэш)
+        :param store: False - не сохранять ответ в кэш карточек (массовые запросы для списков заявок)
+        """
+        if use_cache:
+            cached = await sc_detail_cache.get(telegram_user_id, sc_number)
+            if cached is not None:
+                logger.debug(f"Кэш HIT карточки заявки {sc_number} для {telegram_user_id}")
+                return cached
+
+        return await ItiliumBaseApi._request_sc(telegram_user_id, sc_number, store)
+
+    @staticmethod
+    @single_flight("find_sc")
+    async def _request_sc(telegram_user_id: int, sc_number: str, store: bool) -> dict | None:
+        # Версия берется до запроса: ответ, полученный во время изменения заявки, в кэш не попадет
+        version = await sc_detail_cache.version(sc_number) if store else None
+        result = await ItiliumBaseApi._fetch_sc(telegram_user_id, sc_number)
+        if store and isinstance(result, dict):
+            await sc_detail_cache.set(telegram_user_id, sc_number, result, version)
+        return result
+
+    @staticmethod
+    async def _fetch_sc(telegram_user_id: int, sc_number: str) -> dict | None:
         try:
+            url = ApiUrls.FIND_SC.format(
+                telegram_user_id=telegram_user_id,
+                sc_number=sc_number
+            )
             resp = await log_and_request(
                 method="POST",
-                url=settings.ITILIUM_URL + ApiUrls.FIND_SC.format(
-                    telegram_user_id=telegram_user_id,
-                    sc_number=sc_number
-                ),
-                auth=(settings.ITILIUM_LOGIN, settings.ITILIUM_PASSWORD)
+                url=settings.ITILIUM_URL + url,
+                auth=(settings.ITILIUM_LOGIN, settings.ITILIUM_PASSWORD),
+                retry_policy=ItiliumBaseApi.retry_policy("find_sc_by_id"),
+                circuit_breaker=itilium_circuit_breakers.for_url(url)
             )
 
             logger.debug(f"response code: {resp.status_code} | response text: {resp.text}")
 
             if resp.status_code == httpx.codes.OK and len(resp.text) > 0:
                 return resp.json()
+        except CircuitOpenError:
+            # Итилиум недоступен: это не "заявка не найдена", пробрасываем для ответа ITILIUM_ERROR
+            raise
         except Exception as e:
             logger.debug(f"error for {telegram_user_id} {sc_number} {e}")
             logger.exception(e)
             return None
 
     @staticmethod
-    async def get_task_for_async_find_sc_by_id(scs: list, callback: CallbackQuery):
-        tasks = [asyncio.create_task(ItiliumBaseApi.find_sc_by_id(callback.from_user.id, sc)) for sc in scs]
-        return await asyncio.gather(*tasks, return_exceptions=True)
+    async def get_task_for_async_find_sc_by_id(
+            scs: list,
+            callback: CallbackQuery,
+            on_result: Callable[[int, FanOutResult], None] | None = None
+    ) -> list[FanOutResult]:
+        """
+        Запрашивает find_sc по списку номеров заявок с ограничением параллельности (общим и на пользователя).
+        Результаты возвращаются в порядке scs. Ненайденная заявка - результат с value=None,
+        ошибка или таймаут запроса - результат с error.
+        :param on_result: вызывается с (индекс, результат) по мере готовности каждой заявки
+        """
+        telegram_user_id = callback.from_user.id
+        return await fan_out_executor.map(
+            key=telegram_user_id,
+            # Для списка нужны только номер и тема: карточки кэшируются при открытии заявки
+            func=lambda sc_number: ItiliumBaseApi.find_sc_by_id(telegram_user_id, sc_number, store=False),
+            items=scs,
+            on_result=on_result,
+        )
+
+    @staticmethod
+    async def _send_sc_change(sc_number: str, url: str, data: dict | None = None) -> Response:
+        """
+        Запрос, изменяющий заявку. После него (в том числе при ошибке, когда результат неизвестен)
+        карточка заявки удаляется из кэша у всех пользователей
+        """
+        try:
+            return await ItiliumBaseApi.send_request("POST", url, data)
+        finally:
+            await sc_detail_cache.invalidate(sc_number)
 
     @staticmethod
     async def add_comment_to_sc(
@@ -223,12 +337,7 @@ class ItiliumBaseApi:
             url += f"&files={url_params}"
             logger.debug(f"url: {url}")
 
-        return await (ItiliumBaseApi
-        .send_request(
-            "POST",
-            url,
-            data
-        ))
+        return await ItiliumBaseApi._send_sc_change(sc_number, url, data)
 
     @staticmethod
     async def confirm_sc(
@@ -251,15 +360,21 @@ class ItiliumBaseApi:
         if comment:
             url += f"&comment_text={comment}"
 
-        return await (ItiliumBaseApi.send_request("POST", url, None))
+        return await ItiliumBaseApi._send_sc_change(sc_number, url)
 
     @staticmethod
+    @single_flight("list_sc_responsible")
     async def scs_responsibility_tasks(telegram_user_id: int) -> Response:
         url = ApiUrls.SCS_RESPONSIBLE.format(
             telegram_user_id=telegram_user_id,
         )
 
-        return await (ItiliumBaseApi.send_request("POST", url, None))
+        return await (ItiliumBaseApi.send_request(
+            "POST",
+            url,
+            None,
+            retry_policy=ItiliumBaseApi.retry_policy("scs_responsibility_tasks")
+        ))
 
     @staticmethod
     async def change_sc_state(
@@ -273,7 +388,7 @@ class ItiliumBaseApi:
             new_state=state
         )
 
-        return await (ItiliumBaseApi.send_request("POST", url, None))
+        return await ItiliumBaseApi._send_sc_change(sc_number, url)
 
     @staticmethod
     async def change_sc_state_with_comment(
@@ -291,9 +406,10 @@ class ItiliumBaseApi:
             comment=comment,
         )
 
-        return await (ItiliumBaseApi.send_request("POST", url, None))
+        return await ItiliumBaseApi._send_sc_change(sc_number, url)
 
     @staticmethod
+    @single_flight("responsibles_sc")
     async def get_responsibles(
             telegram_user_id: int,
             sc_number: str
@@ -306,7 +422,12 @@ class ItiliumBaseApi:
             sc_number=sc_number
         )
 
-        return await (ItiliumBaseApi.send_request("POST", url, None))
+        return await (ItiliumBaseApi.send_request(
+            "POST",
+            url,
+            None,
+            retry_policy=ItiliumBaseApi.retry_policy("get_responsibles")
+        ))
 
     @staticmethod
     async def change_responsible(
@@ -323,15 +444,23 @@ class ItiliumBaseApi:
             responsible_employee_id=responsible_employee_id
         )
 
-        return await (ItiliumBaseApi.send_request("POST", url, None))
+        return await ItiliumBaseApi._send_sc_change(sc_number, url)
 
     @staticmethod
     async def get_marketing_services(telegram_id: int) -> list | None:
         """
-        Получение списка сервисов маркетинга
-        :param telegram_id: ID пользователя в Telegram
+        Получение списка сервисов маркетинга (общий для всех пользователей справочник, кэшируется)
+        :param telegram_id: ID пользователя в Telegram (для запроса в Итилиум при промахе кэша)
         :return: список сервисов или None
         """
+        return await reference_cache.get(
+            "marketing_services",
+            lambda: ItiliumBaseApi._request_marketing_services(telegram_id),
+        )
+
+    @staticmethod
+    @single_flight("list_services_marketing")
+    async def _request_marketing_services(telegram_id: int) -> list | None:
         try:
             url = f"{settings.ITILIUM_URL}/listServicesMarketing"
             params = {"telegram": telegram_id}
@@ -340,7 +469,9 @@ class ItiliumBaseApi:
                 method="GET",
                 url=url,
                 params=params,
-                auth=(settings.ITILIUM_LOGIN, settings.ITILIUM_PASSWORD)
+                auth=(settings.ITILIUM_LOGIN, settings.ITILIUM_PASSWORD),
+                retry_policy=ItiliumBaseApi.retry_policy("get_marketing_services"),
+                circuit_breaker=itilium_circuit_breakers.for_url(url)
             )
             
             if response.status_code == 200:
@@ -358,10 +489,18 @@ class ItiliumBaseApi:
     @staticmethod
     async def get_marketing_subdivisions(telegram_id: int) -> list | None:
         """
-        Получение списка подразделений для маркетинга
-        :param telegram_id: ID пользователя в Telegram
+        Получение списка подразделений для маркетинга (общий для всех пользователей справочник, кэшируется)
+        :param telegram_id: ID пользователя в Telegram (для запроса в Итилиум при промахе кэша)
         :return: список подразделений или None
         """
+        return await reference_cache.get(
+            "marketing_subdivisions",
+            lambda: ItiliumBaseApi._request_marketing_subdivisions(telegram_id),
+        )
+
+    @staticmethod
+    @single_flight("list_subdivision_marketing")
+    async def _request_marketing_subdivisions(telegram_id: int) -> list | None:
         try:
             url = f"{settings.ITILIUM_URL}/listSubdivisionMarketing"
             params = {"telegram": telegram_id}
@@ -373,7 +512,9 @@ class ItiliumBaseApi:
                 method="GET",
                 url=url,
                 params=params,
-                auth=(settings.ITILIUM_LOGIN, settings.ITILIUM_PASSWORD)
+                auth=(settings.ITILIUM_LOGIN, settings.ITILIUM_PASSWORD),
+                retry_policy=ItiliumBaseApi.retry_policy("get_marketing_subdivisions"),
+                circuit_breaker=itilium_circuit_breakers.for_url(url)
             )
             
             logger.info(f"Response status: {response.status_code}")
@@ -3,8 +3,8 @@ import logging.config
 import signal
 import sys
 
-from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram import Bot
+from aiogram.filters import ExceptionTypeFilter
 from aiogram.types import BotCommandScopeAllPrivateChats
 
 from config.configuration import settings
@@ -12,12 +12,20 @@ from common.bot_cmds_list import private
 from dialogs import custom_setup_dialogs
 from handlers.group_handler import user_group_router
 from handlers.new_user_handler import new_user_router
-# from apscheduler.schedulers.asyncio import AsyncIOScheduler
-# from sheduler import scheduler_tasks
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from sheduler import scheduler_tasks
 
+from utils.circuit_breaker import CircuitOpenError
+from utils.error_handler import circuit_open_error_handler
 from utils.logger_project import setup_logger, LOG_LEVEL_INFO, LOG_LEVEL_DEBUG
 from utils.http_client import close_http_client
 from utils.db_redis import async_redis_client
+from utils.fsm_storage import create_fsm_storage, create_events_isolation
+from utils.webhook_server import WebhookServer
+from utils.update_scheduler import ChatOrderedDispatcher, UpdateScheduler
+from utils.telegram_rate_limiter import OutgoingRateLimiter
+from utils.async_tasks import wait_background_tasks
+from utils.cache_manager import cache_manager
 
 logger = logging.getLogger(__name__)
 
@@ -27,14 +35,28 @@ from middleware.db_middleware import (
 )
 from middleware.user_access_middleware import UserAccessMiddleware
 
-storage = MemoryStorage()
+storage = create_fsm_storage()
+# Одна изоляция событий для FSM и aiogram_dialog (в режиме redis - общая для всех реплик)
+events_isolation = create_events_isolation(storage)
 bot = Bot(token=settings.BOT_TOKEN)
+# Все исходящие запросы бота проходят через лимиты Telegram и повторяются после retry_after
+bot.session.middleware(OutgoingRateLimiter(
+    global_rate=settings.TELEGRAM_GLOBAL_RATE,
+    chat_rate=settings.TELEGRAM_CHAT_RATE,
+    chat_burst=settings.TELEGRAM_CHAT_BURST,
+    max_retries=settings.TELEGRAM_RETRY_AFTER_MAX_RETRIES,
+))
 bot.my_admins_list = []
-dp = Dispatcher(storage=storage)
+# Апдейты одного чата обрабатываются по порядку, разных чатов - параллельно
+update_scheduler = UpdateScheduler(
+    max_concurrency=settings.UPDATE_MAX_CONCURRENCY,
+    queue_size=settings.UPDATE_QUEUE_SIZE,
+)
+dp = ChatOrderedDispatcher(storage=storage, events_isolation=events_isolation, update_scheduler=update_scheduler)
 
 
 # Aiogram dialog registration
-custom_setup_dialogs(dp)
+custom_setup_dialogs(dp, events_isolation)
 
 
 logger.debug('init routers')
@@ -42,12 +64,46 @@ dp.include_router(user_group_router)
 dp.include_router(new_user_router)
 logger.debug('success init routers')
 
+# Итилиум недоступен (предохранитель разомкнут) - отвечаем пользователю ITILIUM_ERROR
+dp.errors.register(circuit_open_error_handler, ExceptionTypeFilter(CircuitOpenError))
+
 ALLOWED_UPDATES = ['message', 'edited_message', 'callback_query']
 
+# Сервер приема апдейтов в режиме webhook (BOT_MODE=webhook)
+webhook_server: WebhookServer | None = None
+# Фоновый прогрев кэша сотрудников и планировщик его повторов (EMPLOYEE_PREWARM_ENABLED)
+prewarm_task: asyncio.Task | None = None
+prewarm_scheduler: AsyncIOScheduler | None = None
+# Сигнал завершения для режима webhook (polling останавливается через dp.stop_polling)
+stop_event = asyncio.Event()
+
+
+def request_stop(sig: signal.Signals) -> None:
+    """Обработчик SIGTERM/SIGINT: прекращает получение апдейтов, завершение выполняет shutdown в main"""
+    logger.info(f"Получен сигнал {sig.name}...")
+    stop_event.set()
+    if settings.BOT_MODE == "polling":
+        asyncio.create_task(dp.stop_polling())
 
-async def shutdown(signal, loop):
+
+async def shutdown():
     """Корректное завершение приложения"""
-    logger.info(f"Получен сигнал {signal.name}...")
+    # Прекращаем прием апдейтов и дообрабатываем очередь
+    if webhook_server is not None:
+        await webhook_server.stop()
+    
+    # Дообрабатываем апдейты, уже поставленные в очереди чатов
+    await update_scheduler.stop()
+    
+    # Дожидаемся фоновых вызовов Telegram (удаление сообщений и т.п.) до закрытия сессии
+    await wait_background_tasks()
+    
+    # Останавливаем прогрев кэша сотрудников до закрытия HTTP клиента и Redis
+    if prewarm_scheduler is not None:
+        prewarm_scheduler.shutdown(wait=False)
+    if prewarm_task is not None and not prewarm_task.done():
+        prewarm_task.cancel()
+        await asyncio.gather(prewarm_task, return_exceptions=True)
     
     # Останавливаем бота
     await bot.session.close()
@@ -55,29 +111,30 @@ async def shutdown(signal, loop):
     # Закрываем HTTP клиент
     await close_http_client()
     
+    # Закрываем хранилище FSM
+    await storage.close()
+    
+    # Останавливаем подписку на инвалидацию L1 кэша до закрытия Redis
+    await cache_manager.stop_invalidation_listener()
+    
     # Закрываем Redis соединение
     try:
-        redis_client = await async_redis_client.get_client()
-        await redis_client.close()
+        await async_redis_client.close()
         logger.info("Redis соединение закрыто")
     except Exception as e:
         logger.error(f"Ошибка при закрытии Redis: {e}")
     
-    # Останавливаем event loop
-    loop.stop()
     logger.info("Приложение корректно завершено")
 
 
 async def main():
+    global webhook_server, prewarm_task, prewarm_scheduler
     logger.debug('start application')
     
     # Настройка обработчиков сигналов для корректного завершения
     loop = asyncio.get_event_loop()
     for sig in (signal.SIGTERM, signal.SIGINT):
-        loop.add_signal_handler(
-            sig,
-            lambda s=sig: asyncio.create_task(shutdown(s, loop))
-        )
+        loop.add_signal_handler(sig, request_stop, sig)
     
     # cron scheduler apscheduler
     # scheduler = AsyncIOScheduler(timezone="Europe/Moscow")
@@ -91,16 +148,59 @@ async def main():
     dp.update.middleware(ExecuteTimeHandlerMiddleware())
     logger.debug('end init middlewares')
 
-    await bot.delete_webhook(drop_pending_updates=True)
+    dp.start_update_scheduler()
+
+    # Инвалидация L1 кэша между репликами бота
+    cache_manager.start_invalidation_listener()
+
+    if settings.EMPLOYEE_PREWARM_ENABLED:
+        # Прогреваем кэш сотрудников в фоне, не задерживая запуск бота
+        prewarm_task = asyncio.create_task(scheduler_tasks.prewarm_employee_cache())
+
+        if settings.EMPLOYEE_PREWARM_INTERVAL > 0:
+            prewarm_scheduler = AsyncIOScheduler(timezone="Europe/Moscow")
+            prewarm_scheduler.add_job(
+                scheduler_tasks.prewarm_employee_cache,
+                trigger='interval',
+                seconds=settings.EMPLOYEE_PREWARM_INTERVAL,
+            )
+            prewarm_scheduler.start()
+
+    if settings.BOT_MODE == "polling":
+        await bot.delete_webhook(drop_pending_updates=True)
     await bot.delete_my_commands(scope=BotCommandScopeAllPrivateChats())
     await bot.set_my_commands(
         commands=private,
         scope=BotCommandScopeAllPrivateChats()
     )
-    logger.debug('start polling')
     
     try:
-        await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
+        if settings.BOT_MODE == "webhook":
+            logger.debug('start webhook')
+            webhook_server = WebhookServer(
+                dispatcher=dp,
+                bot=bot,
+                url=settings.WEBHOOK_URL,
+                path=settings.WEBHOOK_PATH,
+                secret_token=settings.WEBHOOK_SECRET,
+                host=settings.WEBHOOK_HOST,
+                port=settings.WEBHOOK_PORT,
+            )
+            await webhook_server.start()
+            # Работаем до сигнала завершения
+            await stop_event.wait()
+        else:
+            logger.debug('start polling')
+            # Апдейты ставятся в очереди планировщика, отдельная задача на каждый апдейт не нужна.
+            # Сигналы и закрытие сессии бота обрабатывает приложение: после остановки polling
+            # shutdown дообрабатывает очереди и фоновые вызовы
+            await dp.start_polling(
+                bot,
+                allowed_updates=dp.resolve_used_update_types(),
+                handle_as_tasks=False,
+                handle_signals=False,
+                close_bot_session=False,
+            )
     except KeyboardInterrupt:
         logger.info("Получен сигнал прерывания")
     except Exception as e:
@@ -108,6 +208,7 @@ async def main():
         logger.exception(e)
         sys.exit(1)
     finally:
+        await shutdown()
         logger.info("Приложение остановлено")
 
 
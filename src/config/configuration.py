@@ -29,6 +29,26 @@ class Settings:
         # BOT_TOKEN
         self.BOT_TOKEN: str = self._get_required_env('TOKEN')
         
+        # Режим получения апдейтов: polling или webhook (встроенный HTTP-сервер)
+        self.BOT_MODE: str = os.getenv("BOT_MODE", "polling").lower()
+        # Публичный адрес, по которому Telegram доступен сервер (без пути), и секретный токен webhook
+        self.WEBHOOK_URL: Optional[str] = os.getenv("WEBHOOK_URL")
+        self.WEBHOOK_SECRET: Optional[str] = os.getenv("WEBHOOK_SECRET")
+        self.WEBHOOK_PATH: str = os.getenv("WEBHOOK_PATH", "/webhook")
+        self.WEBHOOK_HOST: str = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+        self.WEBHOOK_PORT: int = int(os.getenv("WEBHOOK_PORT", "8001"))
+        # Обработка апдейтов: очередь на каждый чат (порядок внутри чата сохраняется), чаты - параллельно.
+        # Максимум одновременно выполняемых обработчиков всех чатов
+        self.UPDATE_MAX_CONCURRENCY: int = int(os.getenv("UPDATE_MAX_CONCURRENCY", "100"))
+        # Максимум принятых и еще не обработанных апдейтов, при заполнении прием новых апдейтов приостанавливается
+        self.UPDATE_QUEUE_SIZE: int = int(os.getenv("UPDATE_QUEUE_SIZE", "1000"))
+        # Лимиты отправки сообщений в Telegram: всего в секунду, в секунду на чат и допустимый всплеск в чате
+        self.TELEGRAM_GLOBAL_RATE: float = float(os.getenv("TELEGRAM_GLOBAL_RATE", "30"))
+        self.TELEGRAM_CHAT_RATE: float = float(os.getenv("TELEGRAM_CHAT_RATE", "1"))
+        self.TELEGRAM_CHAT_BURST: int = int(os.getenv("TELEGRAM_CHAT_BURST", "3"))
+        # Сколько раз повторять запрос после ответа 429 с retry_after
+        self.TELEGRAM_RETRY_AFTER_MAX_RETRIES: int = int(os.getenv("TELEGRAM_RETRY_AFTER_MAX_RETRIES", "3"))
+        
         # ITILIUM
         self.ITILIUM_URL: str = self._get_required_env("ITILIUM_URL")
         self.ITILIUM_LOGIN: str = self._get_required_env("ITILIUM_LOGIN")
@@ -41,16 +61,60 @@ class Settings:
         self.REDIS_DATABASE: int = int(os.getenv("REDIS_DATABASE", "0"))
         self.REDIS_TIMEOUT: int = int(os.getenv("REDIS_TIMEOUT", "5"))
         
+        # Хранилище FSM и диалогов: memory (одна реплика) или redis; TTL состояния и данных брошенных сценариев
+        self.FSM_STORAGE: str = os.getenv("FSM_STORAGE", "memory").lower()
+        self.FSM_STATE_TTL: int = int(os.getenv("FSM_STATE_TTL", "86400"))
+        self.FSM_DATA_TTL: int = int(os.getenv("FSM_DATA_TTL", "86400"))
+        
         # Telegram organizations ids
         self.BARS_GROUP_TELEGRAM_ID: Optional[int] = self._get_optional_int_env("BARS_GROUP_TELEGRAM_ID")
         
         # HTTP клиент настройки
         self.HTTP_TIMEOUT: int = int(os.getenv("HTTP_TIMEOUT", "30"))
         self.HTTP_MAX_RETRIES: int = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+        self.HTTP_RETRY_BASE_DELAY: float = float(os.getenv("HTTP_RETRY_BASE_DELAY", "0.5"))
+        self.HTTP_RETRY_MAX_DELAY: float = float(os.getenv("HTTP_RETRY_MAX_DELAY", "8"))
+        # Предохранитель (circuit breaker) для эндпоинтов Итилиума
+        self.CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "5"))
+        self.CIRCUIT_BREAKER_RECOVERY_TIMEOUT: float = float(os.getenv("CIRCUIT_BREAKER_RECOVERY_TIMEOUT", "30"))
+        self.CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS: int = int(os.getenv("CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS", "1"))
+        # Массовые запросы (find_sc по списку заявок): общий лимит, лимит на пользователя и таймаут одного запроса в секундах
+        self.FAN_OUT_MAX_CONCURRENCY: int = int(os.getenv("FAN_OUT_MAX_CONCURRENCY", "20"))
+        self.FAN_OUT_PER_USER_CONCURRENCY: int = int(os.getenv("FAN_OUT_PER_USER_CONCURRENCY", "5"))
+        self.FAN_OUT_TIMEOUT: float = float(os.getenv("FAN_OUT_TIMEOUT", "15"))
+        # Фоновая загрузка следующей страницы списка "Мои заявки"
+        self.SC_PAGE_PREFETCH_ENABLED: bool = os.getenv("SC_PAGE_PREFETCH_ENABLED", "true").lower() in ("1", "true", "yes")
+        # Минимальный интервал (в секундах) между обновлениями списка заявок во время его загрузки
+        self.PROGRESSIVE_RENDER_INTERVAL: float = float(os.getenv("PROGRESSIVE_RENDER_INTERVAL", "1.5"))
         
         # Кэш настройки
         self.CACHE_TTL: int = int(os.getenv("CACHE_TTL", "300"))
         self.USER_CACHE_TTL: int = int(os.getenv("USER_CACHE_TTL", "600"))
+        # Кэш в памяти процесса перед Redis (L1): размер и максимальный срок жизни записи в секундах
+        self.CACHE_L1_ENABLED: bool = os.getenv("CACHE_L1_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.CACHE_L1_MAX_SIZE: int = int(os.getenv("CACHE_L1_MAX_SIZE", "5000"))
+        self.CACHE_L1_TTL: float = float(os.getenv("CACHE_L1_TTL", "30"))
+        # Формат значений кэша в Redis: json | msgpack, сжатие none | zlib | lz4 для значений от порога в байтах
+        self.CACHE_SERIALIZER: str = os.getenv("CACHE_SERIALIZER", "json").lower()
+        self.CACHE_COMPRESSION: str = os.getenv("CACHE_COMPRESSION", "none").lower()
+        self.CACHE_COMPRESSION_THRESHOLD: int = int(os.getenv("CACHE_COMPRESSION_THRESHOLD", "1024"))
+        # Возраст записи кэша сотрудника, после которого она обновляется в фоне (не дольше USER_CACHE_TTL)
+        self.USER_CACHE_SOFT_TTL: int = int(os.getenv("USER_CACHE_SOFT_TTL", "120"))
+        # Кэш ответов 401/403 (не зарегистрирован / ожидает подтверждения) с экспоненциальной отсрочкой
+        self.USER_NEGATIVE_CACHE_TTL: int = int(os.getenv("USER_NEGATIVE_CACHE_TTL", "30"))
+        self.USER_NEGATIVE_CACHE_MAX_TTL: int = int(os.getenv("USER_NEGATIVE_CACHE_MAX_TTL", "600"))
+        # Кэш карточек заявок (find_sc) по пользователю и номеру заявки
+        self.SC_DETAIL_CACHE_TTL: int = int(os.getenv("SC_DETAIL_CACHE_TTL", "120"))
+        # Общий кэш справочников маркетинга: срок хранения и возраст записи, после которого она обновляется в фоне
+        self.REFERENCE_CACHE_TTL: int = int(os.getenv("REFERENCE_CACHE_TTL", "86400"))
+        self.REFERENCE_CACHE_REFRESH_INTERVAL: int = int(os.getenv("REFERENCE_CACHE_REFRESH_INTERVAL", "900"))
+        
+        # Прогрев кэша сотрудников при старте (и по расписанию, если задан интервал в секундах)
+        self.EMPLOYEE_PREWARM_ENABLED: bool = os.getenv("EMPLOYEE_PREWARM_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.EMPLOYEE_PREWARM_ACTIVE_DAYS: int = int(os.getenv("EMPLOYEE_PREWARM_ACTIVE_DAYS", "7"))
+        self.EMPLOYEE_PREWARM_LIMIT: int = int(os.getenv("EMPLOYEE_PREWARM_LIMIT", "1000"))
+        self.EMPLOYEE_PREWARM_CONCURRENCY: int = int(os.getenv("EMPLOYEE_PREWARM_CONCURRENCY", "10"))
+        self.EMPLOYEE_PREWARM_INTERVAL: int = int(os.getenv("EMPLOYEE_PREWARM_INTERVAL", "0"))
         
         # Логирование
         self.LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
@@ -90,6 +154,54 @@ class Settings:
         if not (0 <= self.REDIS_DATABASE <= 15):
             raise ValueError(f"REDIS_DATABASE должен быть в диапазоне 0-15, получено: {self.REDIS_DATABASE}")
         
+        if self.BOT_MODE not in ("polling", "webhook"):
+            raise ValueError(f"BOT_MODE должен быть polling или webhook, получено: {self.BOT_MODE}")
+        
+        if self.BOT_MODE == "webhook":
+            if not self.WEBHOOK_URL:
+                raise ValueError("Для BOT_MODE=webhook обязательна переменная окружения WEBHOOK_URL")
+            # Telegram допускает в секретном токене 1-256 символов A-Z, a-z, 0-9, _ и -
+            if not self.WEBHOOK_SECRET:
+                raise ValueError("Для BOT_MODE=webhook обязательна переменная окружения WEBHOOK_SECRET")
+        
+        if not self.WEBHOOK_PATH.startswith("/"):
+            raise ValueError(f"WEBHOOK_PATH должен начинаться с /, получено: {self.WEBHOOK_PATH}")
+        
+        if not (1 <= self.WEBHOOK_PORT <= 65535):
+            raise ValueError(f"WEBHOOK_PORT должен быть в диапазоне 1-65535, получено: {self.WEBHOOK_PORT}")
+        
+        if self.UPDATE_MAX_CONCURRENCY <= 0:
+            raise ValueError(
+                f"UPDATE_MAX_CONCURRENCY должен быть положительным, получено: {self.UPDATE_MAX_CONCURRENCY}"
+            )
+        
+        if self.UPDATE_QUEUE_SIZE <= 0:
+            raise ValueError(f"UPDATE_QUEUE_SIZE должен быть положительным, получено: {self.UPDATE_QUEUE_SIZE}")
+        
+        if self.TELEGRAM_GLOBAL_RATE <= 0:
+            raise ValueError(f"TELEGRAM_GLOBAL_RATE должен быть положительным, получено: {self.TELEGRAM_GLOBAL_RATE}")
+        
+        if self.TELEGRAM_CHAT_RATE <= 0:
+            raise ValueError(f"TELEGRAM_CHAT_RATE должен быть положительным, получено: {self.TELEGRAM_CHAT_RATE}")
+        
+        if self.TELEGRAM_CHAT_BURST <= 0:
+            raise ValueError(f"TELEGRAM_CHAT_BURST должен быть положительным, получено: {self.TELEGRAM_CHAT_BURST}")
+        
+        if self.TELEGRAM_RETRY_AFTER_MAX_RETRIES < 0:
+            raise ValueError(
+                f"TELEGRAM_RETRY_AFTER_MAX_RETRIES не может быть отрицательным, "
+                f"получено: {self.TELEGRAM_RETRY_AFTER_MAX_RETRIES}"
+            )
+        
+        if self.FSM_STORAGE not in ("memory", "redis"):
+            raise ValueError(f"FSM_STORAGE должен быть memory или redis, получено: {self.FSM_STORAGE}")
+        
+        if self.FSM_STATE_TTL <= 0:
+            raise ValueError(f"FSM_STATE_TTL должен быть положительным, получено: {self.FSM_STATE_TTL}")
+        
+        if self.FSM_DATA_TTL <= 0:
+            raise ValueError(f"FSM_DATA_TTL должен быть положительным, получено: {self.FSM_DATA_TTL}")
+        
         # Проверяем таймауты
         if self.REDIS_TIMEOUT <= 0:
             raise ValueError(f"REDIS_TIMEOUT должен быть положительным, получено: {self.REDIS_TIMEOUT}")
@@ -97,13 +209,109 @@ class Settings:
         if self.HTTP_TIMEOUT <= 0:
             raise ValueError(f"HTTP_TIMEOUT должен быть положительным, получено: {self.HTTP_TIMEOUT}")
         
+        if self.HTTP_MAX_RETRIES < 0:
+            raise ValueError(f"HTTP_MAX_RETRIES не может быть отрицательным, получено: {self.HTTP_MAX_RETRIES}")
+        
+        if not (0 < self.HTTP_RETRY_BASE_DELAY <= self.HTTP_RETRY_MAX_DELAY):
+            raise ValueError(
+                f"HTTP_RETRY_BASE_DELAY должен быть в диапазоне (0, {self.HTTP_RETRY_MAX_DELAY}], "
+                f"получено: {self.HTTP_RETRY_BASE_DELAY}"
+            )
+        
+        if self.CIRCUIT_BREAKER_FAILURE_THRESHOLD <= 0:
+            raise ValueError(
+                f"CIRCUIT_BREAKER_FAILURE_THRESHOLD должен быть положительным, "
+                f"получено: {self.CIRCUIT_BREAKER_FAILURE_THRESHOLD}"
+            )
+        
+        if self.CIRCUIT_BREAKER_RECOVERY_TIMEOUT <= 0:
+            raise ValueError(
+                f"CIRCUIT_BREAKER_RECOVERY_TIMEOUT должен быть положительным, "
+                f"получено: {self.CIRCUIT_BREAKER_RECOVERY_TIMEOUT}"
+            )
+        
+        if self.CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS <= 0:
+            raise ValueError(
+                f"CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS должен быть положительным, "
+                f"получено: {self.CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS}"
+            )
+        
+        if self.FAN_OUT_MAX_CONCURRENCY <= 0:
+            raise ValueError(f"FAN_OUT_MAX_CONCURRENCY должен быть положительным, получено: {self.FAN_OUT_MAX_CONCURRENCY}")
+        
+        if not (0 < self.FAN_OUT_PER_USER_CONCURRENCY <= self.FAN_OUT_MAX_CONCURRENCY):
+            raise ValueError(
+                f"FAN_OUT_PER_USER_CONCURRENCY должен быть в диапазоне [1, {self.FAN_OUT_MAX_CONCURRENCY}], "
+                f"получено: {self.FAN_OUT_PER_USER_CONCURRENCY}"
+            )
+        
+        if self.FAN_OUT_TIMEOUT <= 0:
+            raise ValueError(f"FAN_OUT_TIMEOUT должен быть положительным, получено: {self.FAN_OUT_TIMEOUT}")
+        
+        if self.PROGRESSIVE_RENDER_INTERVAL <= 0:
+            raise ValueError(
+                f"PROGRESSIVE_RENDER_INTERVAL должен быть положительным, получено: {self.PROGRESSIVE_RENDER_INTERVAL}"
+            )
+        
         # Проверяем TTL кэша
         if self.CACHE_TTL <= 0:
             raise ValueError(f"CACHE_TTL должен быть положительным, получено: {self.CACHE_TTL}")
         
+        if self.CACHE_L1_MAX_SIZE <= 0:
+            raise ValueError(f"CACHE_L1_MAX_SIZE должен быть положительным, получено: {self.CACHE_L1_MAX_SIZE}")
+        
+        if self.CACHE_L1_TTL <= 0:
+            raise ValueError(f"CACHE_L1_TTL должен быть положительным, получено: {self.CACHE_L1_TTL}")
+        
+        if self.CACHE_SERIALIZER not in ("json", "msgpack"):
+            raise ValueError(f"CACHE_SERIALIZER должен быть json или msgpack, получено: {self.CACHE_SERIALIZER}")
+        
+        if self.CACHE_COMPRESSION not in ("none", "zlib", "lz4"):
+            raise ValueError(f"CACHE_COMPRESSION должен быть none, zlib или lz4, получено: {self.CACHE_COMPRESSION}")
+        
+        if self.CACHE_COMPRESSION_THRESHOLD < 0:
+            raise ValueError(
+                f"CACHE_COMPRESSION_THRESHOLD не может быть отрицательным, получено: {self.CACHE_COMPRESSION_THRESHOLD}"
+            )
+        
+        if self.SC_DETAIL_CACHE_TTL <= 0:
+            raise ValueError(f"SC_DETAIL_CACHE_TTL должен быть положительным, получено: {self.SC_DETAIL_CACHE_TTL}")
+        
+        if self.REFERENCE_CACHE_TTL <= 0:
+            raise ValueError(f"REFERENCE_CACHE_TTL должен быть положительным, получено: {self.REFERENCE_CACHE_TTL}")
+        
+        if not (0 < self.REFERENCE_CACHE_REFRESH_INTERVAL <= self.REFERENCE_CACHE_TTL):
+            raise ValueError(
+                f"REFERENCE_CACHE_REFRESH_INTERVAL должен быть в диапазоне 1-{self.REFERENCE_CACHE_TTL}, "
+                f"получено: {self.REFERENCE_CACHE_REFRESH_INTERVAL}"
+            )
+        
         if self.USER_CACHE_TTL <= 0:
             raise ValueError(f"USER_CACHE_TTL должен быть положительным, получено: {self.USER_CACHE_TTL}")
         
+        if not (0 < self.USER_CACHE_SOFT_TTL <= self.USER_CACHE_TTL):
+            raise ValueError(
+                f"USER_CACHE_SOFT_TTL должен быть в диапазоне 1-{self.USER_CACHE_TTL}, "
+                f"получено: {self.USER_CACHE_SOFT_TTL}"
+            )
+        
+        if not (0 < self.USER_NEGATIVE_CACHE_TTL <= self.USER_NEGATIVE_CACHE_MAX_TTL):
+            raise ValueError(
+                f"USER_NEGATIVE_CACHE_TTL должен быть в диапазоне 1-{self.USER_NEGATIVE_CACHE_MAX_TTL}, "
+                f"получено: {self.USER_NEGATIVE_CACHE_TTL}"
+            )
+        
+        # Проверяем прогрев кэша сотрудников
+        if self.EMPLOYEE_PREWARM_CONCURRENCY <= 0:
+            raise ValueError(
+                f"EMPLOYEE_PREWARM_CONCURRENCY должен быть положительным, получено: {self.EMPLOYEE_PREWARM_CONCURRENCY}"
+            )
+        
+        if self.EMPLOYEE_PREWARM_INTERVAL < 0:
+            raise ValueError(
+                f"EMPLOYEE_PREWARM_INTERVAL не может быть отрицательным, получено: {self.EMPLOYEE_PREWARM_INTERVAL}"
+            )
+        
         logger.info("Настройки успешно загружены и валидированы")
 
 
@@ -1,10 +1,11 @@
 from aiogram import Dispatcher
+from aiogram.fsm.storage.base import BaseEventIsolation
 from aiogram_dialog import setup_dialogs
 
 from . import bot_menu, registration
 
 
-def custom_setup_dialogs(dp: Dispatcher):
+def custom_setup_dialogs(dp: Dispatcher, events_isolation: BaseEventIsolation):
 
     for dialog in bot_menu.bot_menu_dialogs():
         dp.include_router(dialog)
@@ -12,4 +13,4 @@ def custom_setup_dialogs(dp: Dispatcher):
     for dialog in registration.registration_dialogs():
         dp.include_router(dialog)
 
-    setup_dialogs(dp)
+    setup_dialogs(dp, events_isolation=events_isolation)
@@ -9,6 +9,7 @@ import logging
 
 from api.itilium_api import ItiliumBaseApi
 from dialogs.bot_menu.states import BotMenu, ChangeScStatus
+from services.employee_cache import employee_cache
 from utils.helpers import Helpers
 
 logger = logging.getLogger(__name__)
@@ -149,6 +150,8 @@ async def confirm_change_state_sc_on_new(
     )
 
     if result.status_code == httpx.codes.OK:
+        # Статус заявки влияет на список заявок сотрудника в закэшированном find_employee
+        await employee_cache.invalidate(callback.from_user.id)
         await send_data_to_api.delete()
         await callback.bot.send_message(
             chat_id=callback.from_user.id,
@@ -9,6 +9,7 @@ from aiogram_dialog.widgets.kbd import Button
 
 from api.itilium_api import ItiliumBaseApi
 from dialogs.registration.states import RegistrationDialog
+from services.employee_cache import employee_cache
 from utils.message_templates import MessageTemplates
 
 logger = logging.getLogger(__name__)
@@ -146,6 +147,8 @@ async def submit_registration(
     try:
         response = await ItiliumBaseApi.create_registration_request(payload)
         if response.status_code in (httpx.codes.OK, httpx.codes.CREATED):
+            # Статус пользователя в Итилиуме изменился, закэшированный 401 больше не актуален
+            await employee_cache.invalidate(callback.from_user.id)
             await target_message.edit_text(MessageTemplates.REGISTRATION_SUCCESS)
         else:
             logger.error(
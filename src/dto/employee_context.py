@@ -0,0 +1,40 @@
+from functools import cached_property
+from typing import Any
+
+
+class EmployeeContext:
+    """
+    Сотрудник Итилиума (ответ find_employee), разобранный один раз за обработку апдейта.
+    Создается в UserAccessMiddleware и передается в обработчики под именем 'employee'.
+    """
+
+    def __init__(self, telegram_id: int, data: dict[str, Any]):
+        self.telegram_id: int = telegram_id
+        self._data: dict[str, Any] = data
+
+    @cached_property
+    def uuid(self) -> str | None:
+        """UUID сотрудника в Итилиуме"""
+        return self._data.get("UUID")
+
+    @cached_property
+    def servicecalls(self) -> list[str]:
+        """Номера заявок, созданных сотрудником"""
+        return list(self._data.get("servicecalls") or [])
+
+    @cached_property
+    def can_create_marketing_requests(self) -> bool:
+        """Может ли сотрудник создавать заявки в отдел маркетинга"""
+        return bool(self._data.get("canCreateMarketingRequests", False))
+
+    @property
+    def raw(self) -> dict[str, Any]:
+        """Исходный ответ find_employee"""
+        return self._data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Доступ к остальным полям ответа find_employee"""
+        return self._data.get(key, default)
+
+    def __repr__(self) -> str:
+        return f"EmployeeContext(telegram_id={self.telegram_id}, uuid={self.uuid})"
@@ -1,46 +1,48 @@
-import json
 import logging
+
+from dto.paginated_list_cache import PaginatedListCache
+from dto.sc_projection import sc_list_projection
 from utils.db_redis import async_redis_client
 
 logger = logging.getLogger(__name__)
 
 
-class PaginateScsDTO:
+class PaginateScsDTO(PaginatedListCache):
+    """
+    Кэш списка "Мои заявки". Список хранит только номера заявок (они известны из find_employee без
+    дополнительных запросов), а элементы списка (номер и тема заявки) подгружаются постранично
+    и хранятся в отдельном хэше
+    """
+
     def __init__(self, user_id: int):
         self.user_id: int = user_id
-        self.scs: list = list()
+        super().__init__(str(user_id))
 
-    async def set_cache_scs(self, scs: list) -> None:
-        """
-        Устанавливаем кэш данных по заявкам конкретного пользователя в Redis
-        """
-        redis_client = await async_redis_client.get_client()
-        if redis_client is None:
-            return  # Если Redis недоступен, просто пропускаем кэширование
-        
-        # кешируем результат
-        # Добавление элемента в начало списка
-        for sc in scs:
-            await redis_client.rpush(str(self.user_id), json.dumps(sc))
-
-        # Указываем срок хранения для списка в 60 секунды
-        await redis_client.expire(str(self.user_id), 60)
-
-    async def get_cache_scs(self) -> list:
+    @property
+    def list_items_key(self) -> str:
+        return f"{self.user_id}:list_items"
+
+    async def get_cache_list_items(self, sc_numbers: list) -> dict[str, dict]:
         """
-        Получаем кэш данных по заявкам конкретного пользователя из Redis
+        Получаем закэшированные элементы списка по номерам заявок. Заявки, которых нет в кэше, в результат не попадают
         """
-        redis_client = await async_redis_client.get_client()
-        if redis_client is None:
-            return []  # Если Redis недоступен, возвращаем пустой список
-        # извлекаем из редиса
-        return await redis_client.lrange(str(self.user_id), 0, -1)
+        redis_client = await async_redis_client.get_binary_client()
+        if redis_client is None or not sc_numbers:
+            return {}
+        values = await redis_client.hmget(self.list_items_key, sc_numbers)
+        return {sc_number: self.loads(value) for sc_number, value in zip(sc_numbers, values) if value is not None}
 
-    async def exists(self) -> bool:
+    async def set_cache_list_items(self, scs: dict[str, dict]) -> None:
         """
-        Проверяем, существует ли ключ в Redis
+        Сохраняем элементы списка (номер заявки -> ответ find_sc). Хранится только проекция для списка
         """
-        redis_client = await async_redis_client.get_client()
-        if redis_client is None:
-            return False  # Если Redis недоступен, считаем что данных нет
-        return await redis_client.exists(str(self.user_id))
+        redis_client = await async_redis_client.get_binary_client()
+        if redis_client is None or not scs:
+            return
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                self.list_items_key,
+                mapping={sc_number: self.dumps(sc_list_projection(sc)) for sc_number, sc in scs.items()}
+            )
+            pipe.expire(self.list_items_key, self.CACHE_TTL)
+            await pipe.execute()
@@ -1,46 +1,95 @@
-import json
-import logging
+from typing import Any
+
+from dto.paginated_list_cache import PaginatedListCache
 from utils.db_redis import async_redis_client
 
-logger = logging.getLogger(__name__)
 
+class PaginateTeamsDTO(PaginatedListCache):
+    """
+    Кэш дерева ответственных по заявке (подразделения и их сотрудники) для смены ответственного.
+    Список для постраничного вывода хранит только подразделения, а в той же транзакции записываются
+    индексы: подразделение по id (вместе со списком сотрудников) и сотрудник по id. Все шаги смены
+    ответственного после первого обслуживаются из кэша без запросов get_responsibles
+    """
+
+    # Срок хранения в секундах: на всю смену ответственного, а не на одну страницу
+    CACHE_TTL: int = 300
 
-class PaginateTeamsDTO:
     def __init__(self, user_id: int, sc_number: str):
         self.user_id: int = user_id
         self.sc_number: str = sc_number
-        self.teams: list = list()
+        super().__init__(f"teams:{user_id}:{sc_number}")
 
-    async def set_cache_teams(self, teams: list) -> None:
-        """
-        Устанавливаем кэш данных по подразделениям конкретного пользователя в Redis
-        """
-        redis_client = await async_redis_client.get_client()
-        if redis_client is None:
-            return  # Если Redis недоступен, просто пропускаем кэширование
-        
-        # кешируем результат
-        for team in teams:
-            await redis_client.rpush(f"teams:{str(self.user_id)}:{self.sc_number}", json.dumps(team))
+    @property
+    def teams_index_key(self) -> str:
+        return f"{self.key}:team"
+
+    @property
+    def employees_index_key(self) -> str:
+        return f"{self.key}:employee"
+
+    @staticmethod
+    def project(team: dict) -> dict:
+        return {
+            "responsibleTeamId": team.get("responsibleTeamId"),
+            "responsibleTeamTitle": team.get("responsibleTeamTitle"),
+        }
+
+    @staticmethod
+    def index_teams(teams: list) -> dict[str, dict]:
+        """Подразделения по id"""
+        return {team["responsibleTeamId"]: team for team in teams}
 
-        # Указываем срок хранения для списка в 60 секунды
-        await redis_client.expire(f"teams:{str(self.user_id)}:{self.sc_number}", 60)
+    @staticmethod
+    def index_employees(teams: list) -> dict[str, dict]:
+        """Сотрудники всех подразделений по id"""
+        return {
+            employee["responsibleEmployeeId"]: employee
+            for team in teams
+            for employee in team.get("responsibles") or []
+        }
 
-    async def get_cache_teams(self) -> list:
+    def _queue_set_items(self, pipe, items: list) -> None:
+        super()._queue_set_items(pipe, items)
+        pipe.delete(self.teams_index_key, self.employees_index_key)
+        if not items:
+            return
+
+        pipe.hset(
+            self.teams_index_key,
+            mapping={team_id: self.dumps(team) for team_id, team in self.index_teams(items).items()}
+        )
+        pipe.expire(self.teams_index_key, self.CACHE_TTL)
+
+        employees = self.index_employees(items)
+        if employees:
+            pipe.hset(
+                self.employees_index_key,
+                mapping={employee_id: self.dumps(employee) for employee_id, employee in employees.items()}
+            )
+            pipe.expire(self.employees_index_key, self.CACHE_TTL)
+
+    async def _get_indexed(self, index_key: str, item_id: str) -> dict[str, Any] | None:
+        redis_client = await async_redis_client.get_binary_client()
+        if redis_client is None:
+            return None
+        value = await redis_client.hget(index_key, item_id)
+        return self.loads(value) if value is not None else None
+
+    async def get_team(self, team_id: str) -> dict[str, Any] | None:
         """
-        Получаем кэш данных по подразделениям конкретного пользователя из Redis
+        Подразделение со списком сотрудников (responsibles) из кэша или None
         """
-        redis_client = await async_redis_client.get_client()
-        if redis_client is None:
-            return []  # Если Redis недоступен, возвращаем пустой список
-        # извлекаем из редиса
-        return await redis_client.lrange(f"teams:{str(self.user_id)}:{self.sc_number}", 0, -1)
+        return await self._get_indexed(self.teams_index_key, team_id)
 
-    async def exists(self) -> bool:
+    async def get_employee(self, employee_id: str) -> dict[str, Any] | None:
         """
-        Проверяем, существует ли ключ в Redis
+        Сотрудник из кэша или None
         """
-        redis_client = await async_redis_client.get_client()
+        return await self._get_indexed(self.employees_index_key, employee_id)
+
+    async def delete(self) -> None:
+        redis_client = await async_redis_client.get_binary_client()
         if redis_client is None:
-            return False  # Если Redis недоступен, считаем что данных нет
-        return await redis_client.exists(f"teams:{str(self.user_id)}:{self.sc_number}")
+            return
+        await redis_client.delete(self.key, self.teams_index_key, self.employees_index_key)
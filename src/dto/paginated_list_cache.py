@@ -0,0 +1,98 @@
+import logging
+from typing import Any
+
+from utils.db_redis import async_redis_client
+from utils.serializer import serializer
+
+logger = logging.getLogger(__name__)
+
+
+class PaginatedListCache:
+    """
+    Базовый кэш списка для постраничной навигации в Redis (список под одним ключом с TTL).
+    Список записывается целиком в одной транзакции MULTI/EXEC (DEL + RPUSH + EXPIRE), поэтому
+    читатель никогда не видит частично записанный список или список без срока хранения
+    """
+
+    # Срок хранения списка в секундах
+    CACHE_TTL: int = 60
+
+    def __init__(self, key: str):
+        self.key: str = key
+
+    @staticmethod
+    def project(item: Any) -> Any:
+        """Представление элемента для хранения в кэше. Наследники оставляют только нужные для списка поля"""
+        return item
+
+    @staticmethod
+    def dumps(item: Any) -> bytes:
+        return serializer.dumps(item)
+
+    @staticmethod
+    def loads(value: bytes) -> Any:
+        return serializer.loads(value)
+
+    async def set_items(self, items: list) -> None:
+        """
+        Устанавливаем кэш списка в Redis (предыдущее содержимое ключа заменяется)
+        """
+        redis_client = await async_redis_client.get_binary_client()
+        if redis_client is None:
+            return  # Если Redis недоступен, просто пропускаем кэширование
+
+        async with redis_client.pipeline(transaction=True) as pipe:
+            self._queue_set_items(pipe, items)
+            await pipe.execute()
+
+    def _queue_set_items(self, pipe, items: list) -> None:
+        """
+        Команды записи списка в транзакцию set_items. Наследники добавляют в ту же транзакцию свои индексы
+        """
+        pipe.delete(self.key)
+        if items:
+            pipe.rpush(self.key, *(self.dumps(self.project(item)) for item in items))
+            pipe.expire(self.key, self.CACHE_TTL)
+
+    async def delete(self) -> None:
+        """
+        Удаляем кэш списка
+        """
+        redis_client = await async_redis_client.get_binary_client()
+        if redis_client is None:
+            return
+        await redis_client.delete(self.key)
+
+    async def get_items(self) -> list:
+        """
+        Получаем кэш списка из Redis
+        """
+        redis_client = await async_redis_client.get_binary_client()
+        if redis_client is None:
+            return []  # Если Redis недоступен, возвращаем пустой список
+        return [self.loads(value) for value in await redis_client.lrange(self.key, 0, -1)]
+
+    async def get_page(self, page: int, page_size: int) -> tuple[list, int]:
+        """
+        Получаем из Redis только элементы страницы page и общую длину списка (LRANGE + LLEN в одном запросе).
+        Пустые списки не кэшируются, поэтому длина 0 означает, что кэша нет
+        """
+        redis_client = await async_redis_client.get_binary_client()
+        if redis_client is None:
+            return [], 0  # Если Redis недоступен, считаем что данных нет
+
+        start = page * page_size
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.lrange(self.key, start, start + page_size - 1)
+            pipe.llen(self.key)
+            values, total = await pipe.execute()
+        return [self.loads(value) for value in values], total
+
+    async def exists(self) -> bool:
+        """
+        Проверяем, существует ли ключ в Redis
+        """
+        redis_client = await async_redis_client.get_binary_client()
+        if redis_client is None:
+            return False  # Если Redis недоступен, считаем что данных нет
+        return bool(await redis_client.exists(self.key))
@@ -0,0 +1,10 @@
+# Поля заявки, необходимые для вывода в списках (кнопка "(номер) тема")
+SC_LIST_FIELDS = ("number", "shortDescription")
+
+
+def sc_list_projection(sc: dict) -> dict:
+    """
+    Компактное представление заявки для кэша списков: только номер и тема.
+    Полный ответ find_sc (с HTML-описанием, комментариями и т.д.) в списках не хранится
+    """
+    return {field: sc.get(field) for field in SC_LIST_FIELDS}
@@ -13,17 +13,22 @@ from api.itilium_api import ItiliumBaseApi
 from bot_enums.user_enums import UserButtonText
 from dialogs.bot_menu.states import ChangeScStatus
 from dialogs.bot_menu.calendar_states import CalendarDialog
+from dto.employee_context import EmployeeContext
 from dto.paginate_scs_dto import PaginateScsDTO
 from dto.paginate_scs_responsible_dto import PaginateResponsibleScsDTO
 from dto.paginate_teams_dto import PaginateTeamsDTO
-from dto.paginate_marketing_subdivisions_dto import PaginateMarketingSubdivisionsDTO
 from filters.chat_types import ChatTypeFilter
 from fsm.user_fsm import CreateNewIssue, CreateComment, SearchSC, LoadPagination, ConfirmSc, LoadPaginationResponsible
 from fsm.marketing_fsm import MarketingRequest
 from kbds.inline import get_callback_btns
 from kbds.reply import get_keyboard
 from kbds.user_kbds import USER_MENU_KEYBOARD
-from services.user_private_service import base_start_handler, paginate_scs_logic, paginate_responsible_scs_logic, paginate_teams_logic
+from services.employee_cache import employee_cache
+from services.user_private_service import base_start_handler, paginate_scs_logic, paginate_responsible_scs_logic, \
+    paginate_teams_logic, resolve_employee_context, load_scs_page, show_responsible_scs_progressively, \
+    get_responsible_team, get_responsible_employee
+from utils.async_tasks import fire_and_forget
+from utils.circuit_breaker import CircuitOpenError
 from utils.helpers import Helpers
 from utils.message_templates import MessageTemplates, MessageFormatter, ButtonTemplates
 
@@ -76,20 +81,13 @@ async def handle_marketing_file_upload(message: types.Message, state: FSMContext
         files.append(file_path)
         file_names.append(original_filename)
         
-        # Сохраняем обновленный список
-        await state.update_data(uploaded_files=files, uploaded_file_names=file_names)
-        
-        # Получаем ID предыдущего сообщения с кнопками (если есть)
-        data = await state.get_data()
+        # Удаляем старое сообщение с кнопками в фоне, не задерживая ответ
         old_message_id = data.get("file_upload_message_id")
-        
-        # Удаляем старое сообщение с кнопками, если оно есть
         if old_message_id:
-            try:
-                await bot.delete_message(chat_id=message.chat.id, message_id=old_message_id)
-                logger.info(f"Deleted old file upload message {old_message_id}")
-            except Exception as e:
-                logger.warning(f"Could not delete old message {old_message_id}: {e}")
+            fire_and_forget(
+                bot.delete_message(chat_id=message.chat.id, message_id=old_message_id),
+                description=f"удаление старого сообщения загрузки файлов {old_message_id}",
+            )
         
         # Отправляем одно объединенное сообщение с обновленной информацией и кнопками
         sent_message = await message.answer(
@@ -106,11 +104,12 @@ async def handle_marketing_file_upload(message: types.Message, state: FSMContext
             )
         )
         
-        # Сохраняем ID нового сообщения для возможного удаления в будущем
-        await state.update_data(file_upload_message_id=sent_message.message_id)
-        
-        # Обновляем данные в FSM для корректного отображения в других обработчиках
-        await state.update_data(uploaded_files=files)
+        # Сохраняем обновленный список файлов и ID нового сообщения для возможного удаления в будущем
+        await state.update_data(
+            uploaded_files=files,
+            uploaded_file_names=file_names,
+            file_upload_message_id=sent_message.message_id,
+        )
         
     except Exception as e:
         logger.error(f"Error handling file upload: {e}")
@@ -170,24 +169,22 @@ async def handler_menu_command(
 
 
 @new_user_router.callback_query(StateFilter(None), F.data.startswith("crate_new_issue"))
-async def crate_new_issue_command(callback: types.CallbackQuery, state: FSMContext):
+async def crate_new_issue_command(
+        callback: types.CallbackQuery,
+        state: FSMContext,
+        employee: EmployeeContext | None = None,
+):
     """
     Метод инициирует создание нового обращения с проверкой прав на маркетинговые заявки.
     """
     logger.debug("Perform callback command create_new_issue")
     await callback.answer()
     
-    # Показываем индикатор загрузки
-    loading_msg = await callback.message.answer("🔄 Загружаю... подождите")
-    
     try:
-        # Получаем данные пользователя для проверки прав
-        user_data = await ItiliumBaseApi.get_employee_data_by_identifier(callback)
-        
-        # Удаляем индикатор загрузки
-        await loading_msg.delete()
+        # Данные пользователя для проверки прав уже получены в UserAccessMiddleware
+        employee = await resolve_employee_context(callback, employee)
         
-        if user_data and user_data.get('canCreateMarketingRequests', False):
+        if employee and employee.can_create_marketing_requests:
             # Пользователь может создавать маркетинговые заявки
             await callback.message.answer(
                 text="Выберите тип заявки:",
@@ -212,8 +209,6 @@ async def crate_new_issue_command(callback: types.CallbackQuery, state: FSMConte
             await state.update_data(files=[])
             
     except Exception as e:
-        await loading_msg.delete()
-        
         # Сбрасываем FSM состояние при ошибке
         await state.clear()
         
@@ -234,7 +229,8 @@ async def crate_new_issue_command(callback: types.CallbackQuery, state: FSMConte
 )
 async def confirm_crate_new_issue_command(
         message: types.Message,
-        state: FSMContext
+        state: FSMContext,
+        employee: EmployeeContext | None = None,
 ):
     data = await state.get_data()
 
@@ -242,7 +238,7 @@ async def confirm_crate_new_issue_command(
     logger.debug(f"get user information from itilium by telegram id {message.from_user.id}")
     
     try:
-        user_data_from_itilium: dict | None = await ItiliumBaseApi.get_employee_data_by_identifier(message)
+        employee = await resolve_employee_context(message, employee)
     except Exception as e:
         logger.error(f"Error getting user data: {e}")
         await state.clear()
@@ -253,7 +249,7 @@ async def confirm_crate_new_issue_command(
         )
         return
     
-    if user_data_from_itilium is None:
+    if employee is None:
         logger.debug("user not found in Itilium")
         await state.clear()
         await message.answer(
@@ -270,7 +266,7 @@ async def confirm_crate_new_issue_command(
     )
     try:
         response: Response = await ItiliumBaseApi.create_new_sc({
-            "UUID": user_data_from_itilium["UUID"],
+            "UUID": employee.uuid,
             "Description": data["description"],
             "shortDescription": Helpers.prepare_short_description_for_sc(data["description"]),
         }, data["files"])
@@ -278,6 +274,8 @@ async def confirm_crate_new_issue_command(
         logger.debug(f"{response.status_code} | {response.text}")
 
         if response.status_code in (httpx.codes.OK, httpx.codes.CREATED, httpx.codes.NO_CONTENT):
+            # Список заявок сотрудника (servicecalls) изменился, закэшированный find_employee устарел
+            await employee_cache.invalidate(message.from_user.id)
             # Удаляем служебное сообщение "Отправляю заявку..." и отправляем новое об успехе
             try:
                 await loading_msg.delete()
@@ -723,6 +721,8 @@ async def hide_sc_info_callback(
     )
 
     if result.status_code == httpx.codes.OK:
+        # Статус заявки влияет на список заявок сотрудника в закэшированном find_employee
+        await employee_cache.invalidate(callback.from_user.id)
         # Получаем обновленные данные заявки
         response: dict | None = await ItiliumBaseApi.find_sc_by_id(callback.from_user.id, sc_number)
         
@@ -771,7 +771,8 @@ async def search_sc_by_number_callback(
         text=MessageTemplates.ENTER_ISSUE_NUMBER,
         reply_markup=get_callback_btns(btns=ButtonTemplates.cancel())
     )
-    await state.update_data(preview_message=preview_message)
+    # В FSM храним только id сообщения: объекты Message не сериализуются в Redis
+    await state.update_data(preview_message_id=preview_message.message_id)
 
 
 @new_user_router.message(SearchSC.sc_number)
@@ -789,11 +790,17 @@ async def handler_perform_search_for_sc_by_number(
     try:
         result: dict | None = await ItiliumBaseApi.find_sc_by_id(message.from_user.id, sc_number)
         logger.debug(f"find sc by number. response {sc_number}")
+    except CircuitOpenError as e:
+        logger.warning(f"find sc by number {sc_number}: {e}")
+        await state.clear()
+        await message.answer(MessageTemplates.ITILIUM_ERROR)
+        fire_and_forget(looking_for.delete(), description="удаление сообщения о поиске заявки")
+        return
     except Exception as e:
         logger.debug(f"error for {message.from_user.id} {sc_number} {e}")
         await state.clear()
         await message.answer(MessageFormatter.issue_search_error(str(e)))
-        await looking_for.delete()
+        fire_and_forget(looking_for.delete(), description="удаление сообщения о поиске заявки")
         return
 
     if isinstance(result, str):
@@ -806,9 +813,12 @@ async def handler_perform_search_for_sc_by_number(
         )
 
     await state.clear()
-    await message.delete()
-    await looking_for.delete()
-    await state_data["preview_message"].delete()
+    # Служебные сообщения удаляются одновременно и в фоне. Данных FSM может не быть (истек FSM_DATA_TTL)
+    cleanup = [message.delete(), looking_for.delete()]
+    preview_message_id = state_data.get("preview_message_id")
+    if preview_message_id:
+        cleanup.append(message.bot.delete_message(chat_id=message.chat.id, message_id=preview_message_id))
+    fire_and_forget(*cleanup, description="удаление сообщений поиска заявки")
 
 
 @new_user_router.callback_query(StateFilter(None), F.data.startswith("del_message"))
@@ -839,7 +849,8 @@ async def change_responsible_callback(
     
     send_message_for_search = None
     
-    if not await paginate_dto.exists():
+    teams, total = await paginate_dto.get_page(0, Helpers.PAGE_SIZE)
+    if not total:
         # Защищаем от повторного запроса
         await state.set_state(LoadPagination.load)
         await state.update_data(load=True)
@@ -849,11 +860,9 @@ async def change_responsible_callback(
         send_message_for_search = result.get("send_message_for_search", None)
         
         # извлекаем из редиса
-        teams = await paginate_dto.get_cache_teams()
-    else:
-        teams = await paginate_dto.get_cache_teams()
+        teams, total = await paginate_dto.get_page(0, Helpers.PAGE_SIZE)
     
-    data_with_pagination = await Helpers.get_paginated_kb_teams(teams)
+    data_with_pagination = await Helpers.get_paginated_kb_teams(teams, 0, total)
     
     if send_message_for_search:
         await send_message_for_search.delete()
@@ -899,7 +908,9 @@ async def show_teams_pagination_callback(
 
     send_message_for_search = None
     
-    if not await paginate_dto.exists():
+    page = int(callback.data.split("teams_page_")[1])
+    teams, total = await paginate_dto.get_page(page, Helpers.PAGE_SIZE)
+    if not total:
         # Защищаем от повторного запроса
         await state.set_state(LoadPagination.load)
         await state.update_data(load=True)
@@ -909,11 +920,9 @@ async def show_teams_pagination_callback(
         send_message_for_search = result.get("send_message_for_search", None)
 
         # извлекаем из редиса
-        teams = await paginate_dto.get_cache_teams()
-    else:
-        teams = await paginate_dto.get_cache_teams()
+        teams, total = await paginate_dto.get_page(page, Helpers.PAGE_SIZE)
 
-    data_with_pagination = await Helpers.get_paginated_kb_teams(teams, int(callback.data.split("teams_page_")[1]))
+    data_with_pagination = await Helpers.get_paginated_kb_teams(teams, page, total)
 
     if send_message_for_search:
         await send_message_for_search.delete()
@@ -949,31 +958,21 @@ async def select_team_callback(
     # Сохраняем выбранное подразделение
     await state.update_data(selected_team_id=team_id)
     
-    # Получаем сотрудников выбранного подразделения
+    # Получаем сотрудников выбранного подразделения из кэша дерева ответственных
     try:
-        response = await ItiliumBaseApi.get_responsibles(user_id, sc_number)
-        if response.status_code == 200:
-            responsibles_data = response.json()
-            
-            # Находим выбранное подразделение
-            selected_team = None
-            for team in responsibles_data:
-                if team['responsibleTeamId'] == team_id:
-                    selected_team = team
-                    break
+        paginate_dto: PaginateTeamsDTO = PaginateTeamsDTO(user_id=user_id, sc_number=sc_number)
+        selected_team = await get_responsible_team(user_id, paginate_dto, team_id)
+        
+        if selected_team:
+            employees = selected_team['responsibles']
+            data_with_pagination = await Helpers.get_paginated_kb_employees(employees)
             
-            if selected_team:
-                employees = selected_team['responsibles']
-                data_with_pagination = await Helpers.get_paginated_kb_employees(employees)
-                
-                await callback.message.edit_text(
-                    text="Выберите ответственного:",
-                    reply_markup=data_with_pagination
-                )
-            else:
-                await callback.answer("Подразделение не найдено")
+            await callback.message.edit_text(
+                text="Выберите ответственного:",
+                reply_markup=data_with_pagination
+            )
         else:
-            await callback.answer("Ошибка получения данных")
+            await callback.answer("Подразделение не найдено")
     except Exception as e:
         logger.error(f"Error getting responsibles: {e}")
         await callback.answer("Ошибка получения данных")
@@ -1000,29 +999,19 @@ async def show_employees_pagination_callback(
     await callback.answer()
 
     try:
-        response = await ItiliumBaseApi.get_responsibles(user_id, sc_number)
-        if response.status_code == 200:
-            responsibles_data = response.json()
-            
-            # Находим выбранное подразделение
-            selected_team = None
-            for team in responsibles_data:
-                if team['responsibleTeamId'] == team_id:
-                    selected_team = team
-                    break
+        paginate_dto: PaginateTeamsDTO = PaginateTeamsDTO(user_id=user_id, sc_number=sc_number)
+        selected_team = await get_responsible_team(user_id, paginate_dto, team_id)
+        
+        if selected_team:
+            employees = selected_team['responsibles']
+            page = int(callback.data.split("employees_page_")[1])
+            data_with_pagination = await Helpers.get_paginated_kb_employees(employees, page)
             
-            if selected_team:
-                employees = selected_team['responsibles']
-                page = int(callback.data.split("employees_page_")[1])
-                data_with_pagination = await Helpers.get_paginated_kb_employees(employees, page)
-                
-                await callback.message.edit_reply_markup(
-                    reply_markup=data_with_pagination
-                )
-            else:
-                await callback.answer("Подразделение не найдено")
+            await callback.message.edit_reply_markup(
+                reply_markup=data_with_pagination
+            )
         else:
-            await callback.answer("Ошибка получения данных")
+            await callback.answer("Подразделение не найдено")
     except Exception as e:
         logger.error(f"Error getting employees: {e}")
         await callback.answer("Ошибка получения данных")
@@ -1102,32 +1091,18 @@ async def confirm_change_responsible_callback(
         if result.status_code == 200:
             await send_data_to_api.delete()
             
-            # Получаем информацию о назначенном сотруднике
+            # Получаем информацию о назначенном сотруднике из кэша дерева ответственных
             try:
-                response = await ItiliumBaseApi.get_responsibles(user_id, sc_number)
-                if response.status_code == 200:
-                    responsibles_data = response.json()
-                    
-                    # Находим назначенного сотрудника
-                    assigned_employee = None
-                    for team in responsibles_data:
-                        for employee in team['responsibles']:
-                            if employee['responsibleEmployeeId'] == employee_id:
-                                assigned_employee = employee
-                                break
-                        if assigned_employee:
-                            break
-                    
-                    if assigned_employee:
-                        await callback.bot.send_message(
-                            chat_id=callback.from_user.id,
-                            text=f"✅ Для заявки №{sc_number} назначен новый ответственный: {assigned_employee['responsibleEmployeeTitle']}"
-                        )
-                    else:
-                        await callback.bot.send_message(
-                            chat_id=callback.from_user.id,
-                            text=f"✅ Для заявки №{sc_number} назначен новый ответственный"
-                        )
+                paginate_dto: PaginateTeamsDTO = PaginateTeamsDTO(user_id=user_id, sc_number=sc_number)
+                assigned_employee = await get_responsible_employee(user_id, paginate_dto, employee_id)
+                # После смены ответственного дерево по заявке могло измениться
+                await paginate_dto.delete()
+                
+                if assigned_employee:
+                    await callback.bot.send_message(
+                        chat_id=callback.from_user.id,
+                        text=f"✅ Для заявки №{sc_number} назначен новый ответственный: {assigned_employee['responsibleEmployeeTitle']}"
+                    )
                 else:
                     await callback.bot.send_message(
                         chat_id=callback.from_user.id,
@@ -1271,6 +1246,7 @@ async def assign_to_team_callback(
 async def show_all_client_scs_callback(
         callback: types.CallbackQuery,
         state: FSMContext,
+        employee: EmployeeContext | None = None,
 ):
     """
     Обработчик кнопки "Мои заявки".
@@ -1289,21 +1265,22 @@ async def show_all_client_scs_callback(
     if is_loading:
         return
 
-    if not await paginate_dto.exists():
+    scs, total = await paginate_dto.get_page(0, Helpers.PAGE_SIZE)
+    if not total:
         # Защищаем от повторного запроса
         await state.set_state(LoadPagination.load)
         await state.update_data(load=True)
 
         logger.debug(f"key with name {user_id} is not exist in Redis!")
-        result: dict = await paginate_scs_logic(callback, paginate_dto)
+        result: dict = await paginate_scs_logic(callback, paginate_dto, employee)
         send_message_for_search = result.get("send_message_for_search", None)
 
         # извлекаем из редиса
-        scs = await paginate_dto.get_cache_scs()
-    else:
-        scs = await paginate_dto.get_cache_scs()
+        scs, total = await paginate_dto.get_page(0, Helpers.PAGE_SIZE)
 
-    data_with_pagination = await Helpers.get_paginated_kb_scs(scs)
+    # Данные заявок запрашиваются только для первой страницы
+    page_scs = await load_scs_page(callback, paginate_dto, scs, 0, total)
+    data_with_pagination = await Helpers.get_paginated_kb_scs(page_scs, 0, total)
 
     if send_message_for_search:
         await send_message_for_search.delete()
@@ -1321,6 +1298,7 @@ async def show_all_client_scs_callback(
 async def show_sc_info_pagination_callback(
         callback: types.CallbackQuery,
         state: FSMContext,
+        employee: EmployeeContext | None = None,
 ):
     """
     Обработчик кнопок постраничной навигации в отображении списка, созданных мною заявок
@@ -1338,22 +1316,23 @@ async def show_sc_info_pagination_callback(
     if is_loading:
         return
 
-    if not await paginate_dto.exists():
+    page = int(callback.data.split("sc_page_")[1])
+    scs, total = await paginate_dto.get_page(page, Helpers.PAGE_SIZE)
+    if not total:
         # Защищаем от повторного запроса
         await state.set_state(LoadPagination.load)
         await state.update_data(load=True)
 
         logger.debug(f"key with name {callback.from_user.id} is not exist in Redis!")
-        result: dict = await paginate_scs_logic(callback, paginate_dto)
+        result: dict = await paginate_scs_logic(callback, paginate_dto, employee)
         send_message_for_search = result.get("send_message_for_search", None)
 
         # извлекаем из редиса
-        scs = await paginate_dto.get_cache_scs()
+        scs, total = await paginate_dto.get_page(page, Helpers.PAGE_SIZE)
         await state.clear()
-    else:
-        scs = await paginate_dto.get_cache_scs()
 
-    data_with_pagination = await Helpers.get_paginated_kb_scs(scs, int(callback.data.split("sc_page_")[1]))
+    page_scs = await load_scs_page(callback, paginate_dto, scs, page, total)
+    data_with_pagination = await Helpers.get_paginated_kb_scs(page_scs, page, total)
 
     if send_message_for_search:
         await send_message_for_search.delete()
@@ -1373,7 +1352,6 @@ async def show_responsibility_scs_client(
 ):
     user_id = callback.from_user.id
     scs = None
-    send_message_for_search = None
 
     state_data = await state.get_data()
     is_loading = state_data.get("load", None)
@@ -1384,20 +1362,20 @@ async def show_responsibility_scs_client(
     if is_loading:
         return
 
-    if not await paginate_dto.exists():
-        result: dict = await paginate_responsible_scs_logic(callback, paginate_dto)
-
-        send_message_for_search = result.get("send_message_for_search", None)
-
-        # извлекаем из редиса
-        scs = await paginate_dto.get_cache_responsible_scs()
-    else:
-        scs = await paginate_dto.get_cache_responsible_scs()
+    scs, total = await paginate_dto.get_page(0, Helpers.PAGE_SIZE)
+    if not total:
+        # Защищаем от повторного запроса
+        await state.set_state(LoadPaginationResponsible.load)
+        await state.update_data(load=True)
 
-    data_with_pagination = await Helpers.get_paginated_kb_responsible_scs(scs)
+        try:
+            # Список выводится в отдельном сообщении по мере загрузки заявок
+            await show_responsible_scs_progressively(callback, paginate_dto)
+        finally:
+            await state.clear()
+        return
 
-    if send_message_for_search:
-        await send_message_for_search.delete()
+    data_with_pagination = await Helpers.get_paginated_kb_responsible_scs(scs, 0, total)
 
     await state.clear()
 
@@ -1429,7 +1407,9 @@ async def show_sc_info_pagination_callback(
     if is_loading:
         return
 
-    if not await paginate_dto.exists():
+    page = int(callback.data.split("responsible_sc_page_")[1])
+    scs, total = await paginate_dto.get_page(page, Helpers.PAGE_SIZE)
+    if not total:
         # Защищаем от повторного запроса
         await state.set_state(LoadPagination.load)
         await state.update_data(load=True)
@@ -1439,12 +1419,10 @@ async def show_sc_info_pagination_callback(
         send_message_for_search = result.get("send_message_for_search", None)
 
         # извлекаем из редиса
-        scs = await paginate_dto.get_cache_responsible_scs()
+        scs, total = await paginate_dto.get_page(page, Helpers.PAGE_SIZE)
         await state.clear()
-    else:
-        scs = await paginate_dto.get_cache_responsible_scs()
 
-    data_with_pagination = await Helpers.get_paginated_kb_responsible_scs(scs, int(callback.data.split("responsible_sc_page_")[1]))
+    data_with_pagination = await Helpers.get_paginated_kb_responsible_scs(scs, page, total)
 
     if send_message_for_search:
         await send_message_for_search.delete()
@@ -1491,7 +1469,11 @@ async def confirm_sc_handler(
         mark = m.group(2)
         logger.debug(f"callback {callback.data} | sc_number {sc_number} | mark {mark}")
         await state.set_state(ConfirmSc.grade)
-        await state.update_data(grade=mark, sc_number=sc_number, message_with_choice_grade=callback.message)
+        await state.update_data(
+            grade=mark,
+            sc_number=sc_number,
+            message_with_choice_grade_id=callback.message.message_id
+        )
         await callback.message.answer(
             text=MessageFormatter.your_grade(mark),
             reply_markup=get_callback_btns(btns=ButtonTemplates.grade_actions())
@@ -1510,7 +1492,7 @@ async def set_grade_for_confirm_sc_handler(
     grade = int(data["grade"])
     comment = data.get("comment", None)
     message_ids: list = data.get("messages_ids", [])
-    message_with_choice_grade: types.Message = data.get("message_with_choice_grade")
+    message_with_choice_grade_id: int = data.get("message_with_choice_grade_id")
 
     await callback.answer()
 
@@ -1543,8 +1525,14 @@ async def set_grade_for_confirm_sc_handler(
     )
 
     if response and response.status_code == httpx.codes.OK:
-        await callback.message.edit_reply_markup(str(message_with_choice_grade), reply_markup=None)
-        await message_with_choice_grade.edit_reply_markup(str(message_with_choice_grade), reply_markup=None)
+        # Подтвержденная заявка уходит из списка заявок сотрудника в закэшированном find_employee
+        await employee_cache.invalidate(callback.from_user.id)
+        await callback.message.edit_reply_markup(reply_markup=None)
+        await callback.bot.edit_message_reply_markup(
+            chat_id=callback.message.chat.id,
+            message_id=message_with_choice_grade_id,
+            reply_markup=None
+        )
 
         await callback.message.delete()
         await callback.message.answer(text=f"Ваша оценка ({data['grade']}) отправлена!")
@@ -1625,9 +1613,9 @@ async def back_to_teams_callback(
     try:
         paginate_dto: PaginateTeamsDTO = PaginateTeamsDTO(user_id=callback.from_user.id, sc_number=sc_number)
         
-        if await paginate_dto.exists():
-            teams = await paginate_dto.get_cache_teams()
-            data_with_pagination = await Helpers.get_paginated_kb_teams(teams)
+        teams, total = await paginate_dto.get_page(0, Helpers.PAGE_SIZE)
+        if total:
+            data_with_pagination = await Helpers.get_paginated_kb_teams(teams, 0, total)
             
             await callback.message.edit_text(
                 text="Выберите подразделение:",
@@ -1658,31 +1646,21 @@ async def back_to_employees_callback(
     
     await callback.answer()
     
-    # Получаем сотрудников выбранного подразделения
+    # Получаем сотрудников выбранного подразделения из кэша дерева ответственных
     try:
-        response = await ItiliumBaseApi.get_responsibles(callback.from_user.id, sc_number)
-        if response.status_code == 200:
-            responsibles_data = response.json()
-            
-            # Находим выбранное подразделение
-            selected_team = None
-            for team in responsibles_data:
-                if team['responsibleTeamId'] == team_id:
-                    selected_team = team
-                    break
+        paginate_dto: PaginateTeamsDTO = PaginateTeamsDTO(user_id=callback.from_user.id, sc_number=sc_number)
+        selected_team = await get_responsible_team(callback.from_user.id, paginate_dto, team_id)
+        
+        if selected_team:
+            employees = selected_team['responsibles']
+            data_with_pagination = await Helpers.get_paginated_kb_employees(employees)
             
-            if selected_team:
-                employees = selected_team['responsibles']
-                data_with_pagination = await Helpers.get_paginated_kb_employees(employees)
-                
-                await callback.message.edit_text(
-                    text="Выберите ответственного:",
-                    reply_markup=data_with_pagination
-                )
-            else:
-                await callback.answer("Подразделение не найдено")
+            await callback.message.edit_text(
+                text="Выберите ответственного:",
+                reply_markup=data_with_pagination
+            )
         else:
-            await callback.answer("Ошибка получения данных")
+            await callback.answer("Подразделение не найдено")
     except Exception as e:
         logger.error(f"Error getting employees: {e}")
         await callback.answer("Ошибка получения данных")
@@ -1724,29 +1702,18 @@ async def confirm_assign_to_team_callback(
         await send_data_to_api.delete()
         
         if result.status_code == 200:
-            # Получаем информацию о назначенном подразделении
+            # Получаем информацию о назначенном подразделении из кэша дерева ответственных
             try:
-                response = await ItiliumBaseApi.get_responsibles(user_id, sc_number)
-                if response.status_code == 200:
-                    responsibles_data = response.json()
-                    
-                    # Находим назначенное подразделение
-                    assigned_team = None
-                    for team in responsibles_data:
-                        if team['responsibleTeamId'] == team_id:
-                            assigned_team = team
-                            break
-                    
-                    if assigned_team:
-                        await callback.bot.send_message(
-                            chat_id=callback.from_user.id,
-                            text=f"✅ Для заявки №{sc_number} назначено подразделение: {assigned_team['responsibleTeamTitle']}"
-                        )
-                    else:
-                        await callback.bot.send_message(
-                            chat_id=callback.from_user.id,
-                            text=f"✅ Для заявки №{sc_number} назначено подразделение"
-                        )
+                paginate_dto: PaginateTeamsDTO = PaginateTeamsDTO(user_id=user_id, sc_number=sc_number)
+                assigned_team = await get_responsible_team(user_id, paginate_dto, team_id)
+                # После смены ответственного дерево по заявке могло измениться
+                await paginate_dto.delete()
+                
+                if assigned_team:
+                    await callback.bot.send_message(
+                        chat_id=callback.from_user.id,
+                        text=f"✅ Для заявки №{sc_number} назначено подразделение: {assigned_team['responsibleTeamTitle']}"
+                    )
                 else:
                     await callback.bot.send_message(
                         chat_id=callback.from_user.id,
@@ -1808,11 +1775,23 @@ async def create_regular_issue_callback(callback: types.CallbackQuery, state: FS
 
 
 @new_user_router.callback_query(F.data == "create_marketing_issue")
-async def start_marketing_request_callback(callback: types.CallbackQuery, state: FSMContext):
+async def start_marketing_request_callback(
+        callback: types.CallbackQuery,
+        state: FSMContext,
+        employee: EmployeeContext | None = None,
+):
     """Начало создания маркетинговой заявки"""
     await callback.answer()
     logger.info(f"Starting marketing request for user {callback.from_user.id}")
     
+    # Справочники маркетинга отдаются из общего кэша без запроса в Итилиум,
+    # поэтому права пользователя проверяем до их получения
+    employee = await resolve_employee_context(callback, employee)
+    if not employee or not employee.can_create_marketing_requests:
+        await callback.message.answer(MessageTemplates.MARKETING_NOT_ALLOWED)
+        await state.clear()
+        return
+    
     # Показываем индикатор загрузки
     loading_msg = await callback.message.answer("🔄 Загружаю... подождите")
     
@@ -1919,10 +1898,6 @@ async def choose_service_callback(callback: types.CallbackQuery, state: FSMConte
         # Удаляем индикатор загрузки
         await loading_msg.delete()
         
-        # Создаем DTO для пагинации
-        paginate_dto = PaginateMarketingSubdivisionsDTO(user_id=callback.from_user.id)
-        await paginate_dto.set_cache_subdivisions(subdivisions)
-        
         # Создаем пагинированную клавиатуру
         paginated_keyboard = await Helpers.get_paginated_kb_marketing_subdivisions(subdivisions, page=0)
         
@@ -2317,27 +2292,21 @@ async def back_to_subdivisions_from_date_callback(callback: types.CallbackQuery,
     loading_msg = await callback.message.answer("🔄 Загружаю подразделения...")
     
     try:
-        # Получаем список подразделений из кеша
-        subdivisions_dto = PaginateMarketingSubdivisionsDTO(callback.from_user.id)
-        subdivisions = await subdivisions_dto.get_cache_subdivisions()
+        # Список подразделений общий для всех пользователей и берется из кэша справочников
+        subdivisions = await ItiliumBaseApi.get_marketing_subdivisions(callback.from_user.id)
         
-        # Если кеш пустой, загружаем заново
         if not subdivisions:
-            logger.info(f"Cache empty for user {callback.from_user.id}, reloading subdivisions")
-            subdivisions = await ItiliumBaseApi.get_marketing_subdivisions(callback.from_user.id)
-            
-            if not subdivisions:
-                await loading_msg.delete()
-                await callback.message.edit_text("Ошибка получения списка подразделений. Попробуйте позже.")
-                await state.clear()
-                return
-            
-            # Сохраняем в кеш
-            await subdivisions_dto.set_cache_subdivisions(subdivisions)
+            await loading_msg.delete()
+            await callback.message.edit_text("Ошибка получения списка подразделений. Попробуйте позже.")
+            await state.clear()
+            return
         
         # Удаляем индикатор загрузки
         await loading_msg.delete()
         
+        # Выбор подразделения индексирует список из FSM: сохраняем тот список, по которому строим клавиатуру
+        await state.update_data(subdivisions=subdivisions)
+
         # Создаем клавиатуру для выбора подразделения
         keyboard = await Helpers.get_paginated_kb_marketing_subdivisions(subdivisions, page=0)
         
@@ -2647,7 +2616,7 @@ async def confirm_create_request_callback(callback: types.CallbackQuery, state:
 @new_user_router.callback_query(F.data == "finalize_request")
 async def finalize_request_callback(callback: types.CallbackQuery, state: FSMContext):
     """Финальное создание заявки"""
-    await callback.answer()
+    fire_and_forget(callback.answer(), description="ответ на callback finalize_request")
     data = await state.get_data()
 
     # Показываем индикатор отправки и убираем кнопки
@@ -2696,11 +2665,10 @@ async def finalize_request_callback(callback: types.CallbackQuery, state: FSMCon
         logger.info(f"API Response: {response.status_code} - {response.text}")
         
         if response.status_code == 200 or response.status_code == 201:
-            # Удаляем сообщение с загрузкой и отправляем новое сообщение об успехе
-            try:
-                await callback.message.delete()
-            except Exception:
-                pass
+            # Список заявок сотрудника (servicecalls) изменился, закэшированный find_employee устарел
+            await employee_cache.invalidate(callback.from_user.id)
+            # Удаляем сообщение с загрузкой в фоне и отправляем новое сообщение об успехе
+            fire_and_forget(callback.message.delete(), description="удаление сообщения об отправке заявки")
             await callback.message.answer("✅ Заявка успешно создана!")
         else:
             await callback.message.edit_text(
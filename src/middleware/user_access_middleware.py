@@ -7,8 +7,10 @@ from aiogram.types import CallbackQuery, Message, TelegramObject, Update
 from aiogram_dialog import DialogManager, StartMode
 from aiogram_dialog.api.exceptions import NoContextError
 
-from api.itilium_api import ItiliumBaseApi
+from config.configuration import settings
 from dialogs.registration.states import RegistrationDialog
+from dto.employee_context import EmployeeContext
+from services.employee_cache import employee_cache
 from utils.message_templates import MessageTemplates
 
 logger = logging.getLogger(__name__)
@@ -37,17 +39,25 @@ class UserAccessMiddleware(BaseMiddleware):
             return await handler(event, data)
 
         try:
-            response = await ItiliumBaseApi.find_employee_by_attribute(telegram_id)
+            lookup = await employee_cache.get_or_fetch(telegram_id)
         except Exception as error:
             logger.error("Ошибка проверки пользователя %s: %s", telegram_id, error)
             await self._reply(message, data, MessageTemplates.ITILIUM_ERROR)
             return
 
-        status = response.status_code
+        status = lookup.status_code
         if status == httpx.codes.OK:
-            data["itilium_employee_response"] = response
+            if settings.EMPLOYEE_PREWARM_ENABLED:
+                await employee_cache.record_activity(telegram_id)
+            data["employee"] = EmployeeContext(telegram_id, lookup.body or {})
             return await handler(event, data)
 
+        if lookup.is_negative and lookup.notified:
+            # Ответ уже был отправлен в текущем окне отсрочки: не перезапускаем регистрацию и не дублируем сообщение
+            logger.debug("Пользователь %s повторно обратился в окне отсрочки (код %s)", telegram_id, status)
+            await self._answer_callback(event)
+            return
+
         if status == httpx.codes.UNAUTHORIZED:
             logger.info("Пользователь %s не найден в Итилиуме. Запускаем регистрацию.", telegram_id)
             await self._answer_callback(event)
@@ -63,19 +73,20 @@ class UserAccessMiddleware(BaseMiddleware):
                     await self._reply(message, data, MessageTemplates.REGISTRATION_REQUIRED)
             else:
                 await self._reply(message, data, MessageTemplates.REGISTRATION_REQUIRED)
+            await employee_cache.mark_notified(telegram_id, lookup)
             return
 
         if status == httpx.codes.FORBIDDEN:
             logger.info("Пользователь %s ожидает подтверждения регистрации.", telegram_id)
             await self._answer_callback(event)
             await self._reply(message, data, MessageTemplates.REGISTRATION_PENDING)
+            await employee_cache.mark_notified(telegram_id, lookup)
             return
 
         logger.error(
-            "Неожиданный ответ find_employee для %s. Код: %s | Тело: %s",
+            "Неожиданный ответ find_employee для %s. Код: %s",
             telegram_id,
-            response.status_code,
-            response.text,
+            lookup.status_code,
         )
         await self._reply(message, data, MessageTemplates.ITILIUM_ERROR)
         return
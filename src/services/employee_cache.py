@@ -0,0 +1,271 @@
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, asdict, replace
+from typing import Any, Optional
+
+import httpx
+
+from api.itilium_api import ItiliumBaseApi
+from config.configuration import settings
+from utils.cache_manager import cache_manager
+from utils.db_redis import async_redis_client
+from utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EmployeeLookup:
+    """Результат запроса find_employee: код ответа Итилиума и разобранное тело"""
+    status_code: int
+    body: Optional[dict[str, Any]]
+    fetched_at: float
+    # Срок актуальности записи (для 401/403 растет экспоненциально с каждым повторным отказом)
+    ttl: float = 0
+    # Количество подряд полученных ответов 401/403
+    failures: int = 0
+    # Пользователь уже получил ответ (регистрация / ожидание подтверждения) в текущем окне отсрочки
+    notified: bool = False
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    @property
+    def is_negative(self) -> bool:
+        return self.status_code in (httpx.codes.UNAUTHORIZED, httpx.codes.FORBIDDEN)
+
+    @property
+    def is_expired(self) -> bool:
+        return self.age >= self.ttl
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "EmployeeLookup":
+        return cls(
+            status_code=int(data["status_code"]),
+            body=data.get("body"),
+            fetched_at=float(data["fetched_at"]),
+            ttl=float(data.get("ttl", settings.USER_CACHE_TTL)),
+            failures=int(data.get("failures", 0)),
+            notified=bool(data.get("notified", False)),
+        )
+
+
+class EmployeeCache:
+    """
+    Кэш авторизации сотрудников по telegram_id поверх cache_manager: Redis, общий для всех реплик бота,
+    и L1 в памяти процесса, который сбрасывается на всех репликах при изменении записи (например, после регистрации).
+
+    Записи моложе soft_ttl отдаются как есть. Записи старше soft_ttl отдаются сразу, а в фоне
+    запускается их обновление (stale-while-revalidate). Ожидание запроса в Итилиум происходит только
+    при отсутствии записи или когда она старше ttl (жесткий TTL).
+
+    Ответы 401/403 кэшируются отдельно на negative_ttl, который удваивается с каждым повторным отказом
+    (но не больше negative_max_ttl). Счетчик отказов хранится дольше самой записи, чтобы отсрочка
+    продолжала расти, пока пользователь остается незарегистрированным.
+
+    Пока Redis недоступен, записи (вместе с отметкой об уведомлении и счетчиком отказов) живут
+    в L1 процесса - см. деградированный режим cache_manager.
+
+    Время последнего обращения авторизованных сотрудников хранится в sorted set ACTIVITY_KEY
+    (не чаще ACTIVITY_RECORD_INTERVAL секунд на пользователя в процессе) и используется для прогрева кэша.
+    """
+
+    CACHEABLE_STATUSES = (httpx.codes.OK, httpx.codes.UNAUTHORIZED, httpx.codes.FORBIDDEN)
+    ACTIVITY_KEY = "employee:last_seen"
+    ACTIVITY_RECORD_INTERVAL = 60
+
+    def __init__(
+            self,
+            ttl: int,
+            soft_ttl: int,
+            negative_ttl: int,
+            negative_max_ttl: int,
+    ):
+        self.ttl = ttl
+        self.soft_ttl = soft_ttl
+        self.negative_ttl = negative_ttl
+        self.negative_max_ttl = negative_max_ttl
+        self._refresh_tasks: dict[int, asyncio.Task] = {}
+        # Пользователи, чье обращение уже записано в течение ACTIVITY_RECORD_INTERVAL
+        self._recorded_activity = LRUCache(max_size=10000, ttl=self.ACTIVITY_RECORD_INTERVAL)
+
+    @staticmethod
+    def _key(telegram_id: int) -> str:
+        return f"employee:{telegram_id}"
+
+    def _storage_ttl(self, lookup: EmployeeLookup) -> float:
+        """Сколько хранить запись: для отказов дольше срока актуальности, чтобы помнить счетчик отказов"""
+        remaining = lookup.ttl - lookup.age
+        if lookup.is_negative:
+            remaining += self.negative_max_ttl
+        return remaining
+
+    def _negative_ttl(self, failures: int) -> int:
+        return min(self.negative_ttl * 2 ** (failures - 1), self.negative_max_ttl)
+
+    async def _load(self, telegram_id: int) -> Optional[EmployeeLookup]:
+        """Возвращает сохраненную запись независимо от ее актуальности"""
+        cached = await cache_manager.get(self._key(telegram_id))
+        if cached is None:
+            return None
+
+        try:
+            lookup = EmployeeLookup.from_dict(cached)
+        except (KeyError, TypeError, ValueError) as error:
+            logger.warning("Некорректная запись кэша сотрудника %s: %s", telegram_id, error)
+            return None
+
+        if self._storage_ttl(lookup) <= 0:
+            return None
+        return lookup
+
+    async def get(self, telegram_id: int) -> Optional[EmployeeLookup]:
+        """Возвращает закэшированный результат авторизации, если он не истек"""
+        lookup = await self._load(telegram_id)
+        if lookup is None or lookup.is_expired:
+            return None
+        return lookup
+
+    async def set(self, telegram_id: int, lookup: EmployeeLookup) -> None:
+        """Сохраняет результат авторизации в кэш"""
+        storage_ttl = self._storage_ttl(lookup)
+        if storage_ttl <= 0:
+            return
+
+        await cache_manager.set(self._key(telegram_id), lookup.to_dict(), max(int(storage_ttl), 1))
+
+    async def invalidate(self, telegram_id: int) -> None:
+        """Удаляет результат авторизации пользователя из кэша (вместе со счетчиком отказов)"""
+        await cache_manager.delete(self._key(telegram_id))
+
+    async def mark_notified(self, telegram_id: int, lookup: EmployeeLookup) -> None:
+        """Отмечает, что пользователь получил ответ на отказ в текущем окне отсрочки"""
+        await self.set(telegram_id, replace(lookup, notified=True))
+
+    async def fetch(self, telegram_id: int) -> EmployeeLookup:
+        """Запрашивает сотрудника в Итилиуме и кэширует ответ, если код ответа ожидаемый"""
+        response = await ItiliumBaseApi.find_employee_by_attribute(telegram_id)
+
+        body = None
+        if response.status_code == httpx.codes.OK and len(response.text) != 0:
+            try:
+                body = json.loads(response.text)
+            except json.JSONDecodeError as decode_error:
+                logger.error("Не удалось преобразовать ответ find_employee: %s", decode_error)
+
+        lookup = EmployeeLookup(
+            status_code=response.status_code,
+            body=body,
+            fetched_at=time.time(),
+            ttl=self.ttl,
+        )
+
+        if lookup.is_negative:
+            previous = await self._load(telegram_id)
+            failures = previous.failures + 1 if previous is not None and previous.is_negative else 1
+            lookup.failures = failures
+            lookup.ttl = self._negative_ttl(failures)
+            logger.info(
+                "find_employee для %s вернул %s (отказ подряд: %s). Повторный запрос не раньше, чем через %s с",
+                telegram_id, lookup.status_code, failures, lookup.ttl,
+            )
+
+        # Успешный ответ без тела не кэшируем, чтобы не закрепить пустого сотрудника на весь TTL
+        if lookup.status_code in self.CACHEABLE_STATUSES and (
+                lookup.status_code != httpx.codes.OK or body is not None
+        ):
+            await self.set(telegram_id, lookup)
+        else:
+            logger.debug("Ответ find_employee для %s не кэшируется. Код: %s", telegram_id, lookup.status_code)
+
+        return lookup
+
+    async def get_or_fetch(self, telegram_id: int) -> EmployeeLookup:
+        """
+        Возвращает результат авторизации из кэша, а при промахе запрашивает Итилиум.
+        Устаревшая (старше soft_ttl) положительная запись возвращается сразу и обновляется в фоне.
+        Отказы (401/403) отдаются из кэша до конца окна отсрочки без запросов в Итилиум.
+        """
+        lookup = await self.get(telegram_id)
+        if lookup is None:
+            logger.debug("Кэш MISS авторизации сотрудника %s", telegram_id)
+            return await self.fetch(telegram_id)
+
+        if not lookup.is_negative and lookup.age >= self.soft_ttl:
+            logger.debug("Кэш STALE авторизации сотрудника %s, обновляем в фоне", telegram_id)
+            self.schedule_refresh(telegram_id)
+        else:
+            logger.debug("Кэш HIT авторизации сотрудника %s", telegram_id)
+
+        return lookup
+
+    async def record_activity(self, telegram_id: int) -> None:
+        """Запоминает время обращения сотрудника для прогрева кэша"""
+        if telegram_id in self._recorded_activity:
+            return
+        self._recorded_activity.set(telegram_id, True)
+
+        redis_client = await async_redis_client.get_client()
+        if redis_client is None:
+            return
+        try:
+            await redis_client.zadd(self.ACTIVITY_KEY, {str(telegram_id): time.time()})
+        except Exception as error:
+            logger.warning("Не удалось записать обращение сотрудника %s: %s", telegram_id, error)
+
+    async def get_recently_active(self, since: float, limit: int) -> list[int]:
+        """
+        telegram_id сотрудников, обращавшихся начиная с since (unix time), от последних к ранним.
+        Более ранние обращения удаляются
+        """
+        redis_client = await async_redis_client.get_client()
+        if redis_client is None:
+            return []
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore(self.ACTIVITY_KEY, "-inf", f"({since}")
+            pipe.zrevrangebyscore(self.ACTIVITY_KEY, "+inf", since, start=0, num=limit)
+            _, telegram_ids = await pipe.execute()
+        return [int(telegram_id) for telegram_id in telegram_ids]
+
+    async def prewarm(self, telegram_id: int) -> bool:
+        """
+        Запрашивает сотрудника для прогрева кэша. Пропускает свежие записи и отказы (401/403), в том числе
+        с истекшей отсрочкой: прогрев не должен увеличивать счетчик отказов и сбрасывать отметку об уведомлении.
+        Возвращает True, если запрос в Итилиум выполнялся
+        """
+        lookup = await self._load(telegram_id)
+        if lookup is not None and (lookup.is_negative or lookup.age < self.soft_ttl):
+            return False
+        await self.fetch(telegram_id)
+        return True
+
+    def schedule_refresh(self, telegram_id: int) -> None:
+        """Запускает фоновое обновление записи, если оно еще не выполняется"""
+        if telegram_id in self._refresh_tasks:
+            return
+
+        task = asyncio.create_task(self._refresh(telegram_id))
+        self._refresh_tasks[telegram_id] = task
+        task.add_done_callback(lambda _: self._refresh_tasks.pop(telegram_id, None))
+
+    async def _refresh(self, telegram_id: int) -> None:
+        try:
+            await self.fetch(telegram_id)
+        except Exception as error:
+            # Устаревшая запись продолжит отдаваться до истечения жесткого TTL
+            logger.warning("Не удалось обновить кэш сотрудника %s в фоне: %s", telegram_id, error)
+
+
+# Глобальный экземпляр кэша авторизации сотрудников
+employee_cache = EmployeeCache(
+    ttl=settings.USER_CACHE_TTL,
+    soft_ttl=settings.USER_CACHE_SOFT_TTL,
+    negative_ttl=settings.USER_NEGATIVE_CACHE_TTL,
+    negative_max_ttl=settings.USER_NEGATIVE_CACHE_MAX_TTL,
+)
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from config.configuration import settings
+from utils.cache_manager import cache_manager
+from utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class ReferenceDataCache:
+    """
+    Общий для всех пользователей кэш справочников Итилиума (сервисы и подразделения маркетинга).
+
+    Запись хранится ttl секунд и ключуется именем справочника и областью (scope), от которой
+    зависит ответ Итилиума. Записи старше refresh_interval отдаются сразу, а в фоне запускается
+    их обновление. Одновременные промахи по одному ключу объединяются в один запрос.
+    Пустые ответы и ошибки не кэшируются.
+    """
+
+    def __init__(self, ttl: int, refresh_interval: int):
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self._single_flight = SingleFlight()
+        self._refresh_tasks: dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def _key(name: str, scope: str) -> str:
+        return f"reference:{name}:{scope}"
+
+    async def get(
+            self,
+            name: str,
+            loader: Callable[[], Awaitable[Optional[Any]]],
+            scope: str = "all",
+    ) -> Optional[Any]:
+        """
+        Возвращает справочник из кэша, при промахе загружает его через loader
+        :param loader: запрос справочника в Итилиум, возвращает данные или None при ошибке
+        """
+        key = self._key(name, scope)
+        entry = await cache_manager.get(key)
+        if entry is None:
+            logger.debug(f"Кэш MISS справочника {key}")
+            return await self._single_flight.do(key, self._load, key, loader)
+
+        if time.time() - entry["fetched_at"] >= self.refresh_interval:
+            logger.debug(f"Кэш STALE справочника {key}, обновляем в фоне")
+            self._schedule_refresh(key, loader)
+        return entry["data"]
+
+    async def invalidate(self, name: str, scope: str = "all") -> None:
+        """Удаляет справочник из кэша"""
+        await cache_manager.delete(self._key(name, scope))
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+        data = await loader()
+        if data:
+            await cache_manager.set(key, {"data": data, "fetched_at": time.time()}, self.ttl)
+        return data
+
+    def _schedule_refresh(self, key: str, loader: Callable[[], Awaitable[Optional[Any]]]) -> None:
+        """Запускает фоновое обновление записи, если оно еще не выполняется"""
+        if key in self._refresh_tasks or self._single_flight.in_flight(key):
+            return
+
+        task = asyncio.create_task(self._refresh(key, loader))
+        self._refresh_tasks[key] = task
+        task.add_done_callback(lambda _: self._refresh_tasks.pop(key, None))
+
+    async def _refresh(self, key: str, loader: Callable[[], Awaitable[Optional[Any]]]) -> None:
+        try:
+            await self._single_flight.do(key, self._load, key, loader)
+        except Exception as error:
+            # Устаревшая запись продолжит отдаваться до истечения TTL
+            logger.warning(f"Не удалось обновить справочник {key} в фоне: {error}")
+
+
+# Глобальный экземпляр кэша справочников
+reference_cache = ReferenceDataCache(
+    ttl=settings.REFERENCE_CACHE_TTL,
+    refresh_interval=settings.REFERENCE_CACHE_REFRESH_INTERVAL,
+)
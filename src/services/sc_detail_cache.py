@@ -0,0 +1,105 @@
+import logging
+from typing import Any, Optional
+
+from config.configuration import settings
+from utils.cache_manager import cache_manager
+from utils.db_redis import async_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class ScDetailCache:
+    """
+    Кэш карточек заявок (ответ find_sc) по паре (telegram_id, sc_number).
+
+    Ответ find_sc зависит от пользователя (доступные действия, change_responsible), поэтому ключ включает
+    telegram_id. Для каждой заявки хранится множество пользователей, у которых она закэширована:
+    изменение заявки одним пользователем сбрасывает ее карточки у всех.
+
+    Каждый сброс увеличивает версию заявки. Запрос карточки запоминает версию до обращения в Итилиум,
+    и set не сохраняет ответ, если за время запроса заявку сбросили (ответ мог устареть).
+    Без Redis карточки не кэшируются: сбросить их на других репликах было бы нельзя.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(telegram_id: int, sc_number: str) -> str:
+        return f"sc_detail:{telegram_id}:{sc_number}"
+
+    @staticmethod
+    def _users_key(sc_number: str) -> str:
+        return f"sc_detail_users:{sc_number}"
+
+    @staticmethod
+    def _version_key(sc_number: str) -> str:
+        return f"sc_detail_version:{sc_number}"
+
+    async def version(self, sc_number: str) -> Optional[str]:
+        """Версия заявки (число сбросов ее карточек) или None, если Redis недоступен"""
+        redis_client = await async_redis_client.get_client()
+        if redis_client is None:
+            return None
+        try:
+            return await redis_client.get(self._version_key(sc_number)) or "0"
+        except Exception as e:
+            logger.error(f"Ошибка чтения версии заявки {sc_number}: {e}")
+            return None
+
+    async def get(self, telegram_id: int, sc_number: str) -> Optional[dict[str, Any]]:
+        """Возвращает закэшированную карточку заявки или None"""
+        return await cache_manager.get(self._key(telegram_id, sc_number))
+
+    async def set(self, telegram_id: int, sc_number: str, sc: dict[str, Any], version: Optional[str]) -> None:
+        """
+        Сохраняет карточку заявки, если версия заявки все еще равна version (полученной до запроса в Итилиум).
+        Пользователь попадает в индекс заявки до записи карточки, а версия проверяется и до, и после записи:
+        сброс, пришедшийся на любой момент запроса, не оставит в кэше устаревшую карточку
+        """
+        if version is None:
+            return
+
+        redis_client = await async_redis_client.get_client()
+        if redis_client is None:
+            return
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.sadd(self._users_key(sc_number), telegram_id)
+                pipe.expire(self._users_key(sc_number), self.ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Ошибка сохранения индекса карточек заявки {sc_number}: {e}")
+            return
+
+        key = self._key(telegram_id, sc_number)
+        if await self.version(sc_number) != version:
+            logger.debug(f"Карточка заявки {sc_number} сброшена во время запроса, не кэшируем")
+            return
+        if not await cache_manager.set(key, sc, self.ttl) or await self.version(sc_number) != version:
+            await cache_manager.delete(key)
+
+    async def invalidate(self, sc_number: str) -> None:
+        """Увеличивает версию заявки и удаляет ее карточки у всех пользователей (после изменения заявки)"""
+        redis_client = await async_redis_client.get_client()
+        if redis_client is None:
+            return
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.incr(self._version_key(sc_number))
+                pipe.expire(self._version_key(sc_number), self.ttl)
+                pipe.smembers(self._users_key(sc_number))
+                _, _, telegram_ids = await pipe.execute()
+        except Exception as e:
+            logger.error(f"Ошибка сброса карточек заявки {sc_number}: {e}")
+            return
+
+        await cache_manager.delete(
+            self._users_key(sc_number),
+            *(self._key(telegram_id, sc_number) for telegram_id in telegram_ids)
+        )
+        logger.debug(f"Карточка заявки {sc_number} сброшена для {len(telegram_ids)} пользователей")
+
+
+# Глобальный экземпляр кэша карточек заявок
+sc_detail_cache = ScDetailCache(ttl=settings.SC_DETAIL_CACHE_TTL)
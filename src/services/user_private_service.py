@@ -1,20 +1,32 @@
+import asyncio
 import json
 import logging
 
+import httpx
 from aiogram import types
 from aiogram.types import KeyboardButton, ReplyKeyboardMarkup, Message
 from httpx import Response
 
 from api.itilium_api import ItiliumBaseApi
 from bot_enums.user_enums import UserText, UserButtonText
+from config.configuration import settings
+from dto.employee_context import EmployeeContext
 from dto.paginate_scs_dto import PaginateScsDTO
 from dto.paginate_scs_responsible_dto import PaginateResponsibleScsDTO
 from dto.paginate_teams_dto import PaginateTeamsDTO
+from dto.sc_projection import sc_list_projection
 from kbds.reply import get_keyboard
-from utils.message_templates import MessageTemplates
+from services.employee_cache import employee_cache
+from utils.fan_out import FanOutResult
+from utils.helpers import Helpers
+from utils.message_templates import MessageTemplates, MessageFormatter
+from utils.throttled_render import ThrottledRenderer
 
 logger = logging.getLogger(__name__)
 
+# Фоновые задачи предзагрузки страниц "Мои заявки" по (telegram_id, номер страницы)
+_prefetch_tasks: dict[tuple[int, int], asyncio.Task] = {}
+
 
 async def base_start_handler(message: types.Message) -> None:
     """
@@ -37,21 +49,68 @@ async def base_start_handler(message: types.Message) -> None:
     )
 
 
+async def resolve_employee_context(
+    event: types.Message | types.CallbackQuery,
+    employee: EmployeeContext | None,
+) -> EmployeeContext | None:
+    """
+    Возвращает сотрудника, переданного UserAccessMiddleware. Если middleware не отработал для апдейта,
+    сотрудник берется из кэша авторизации (не более одного запроса find_employee)
+    """
+    if employee is not None:
+        return employee
+
+    lookup = await employee_cache.get_or_fetch(event.from_user.id)
+    if lookup.status_code != httpx.codes.OK or lookup.body is None:
+        return None
+
+    return EmployeeContext(event.from_user.id, lookup.body)
+
+
+def sc_placeholder(sc_number) -> dict:
+    """Элемент списка для заявки, данные которой не удалось загрузить (заявку можно открыть по номеру)"""
+    return {"number": sc_number, "shortDescription": str(MessageTemplates.SC_DETAILS_UNAVAILABLE)}
+
+
+def sc_list_entry(result: FanOutResult) -> dict | None:
+    """Найденная заявка, заглушка при ошибке запроса или None, если заявка не найдена"""
+    if not result.ok:
+        return sc_placeholder(result.item)
+    if isinstance(result.value, dict):
+        return result.value
+    return None
+
+
+def collect_found_scs(results: list[FanOutResult]) -> list[dict]:
+    """
+    Список заявок в исходном порядке. Заявки, которые не удалось загрузить (ошибка или таймаут),
+    остаются в списке заглушками, ненайденные заявки пропускаются
+    """
+    scs = [entry for entry in map(sc_list_entry, results) if entry is not None]
+    failed = sum(not result.ok for result in results)
+    if failed or len(scs) != len(results):
+        logger.warning(
+            f"find_sc: получено {len(scs) - failed} из {len(results)} заявок, ошибок: {failed}"
+        )
+    return scs
+
+
 async def paginate_scs_logic(
     callback: types.CallbackQuery,
     paginate_dto: PaginateScsDTO,
+    employee: EmployeeContext | None = None,
 ) -> dict:
-    user = await ItiliumBaseApi.get_employee_data_by_identifier(callback)
+    employee = await resolve_employee_context(callback, employee)
 
-    if user is None:
+    if employee is None:
         return {}
 
-    logger.debug(f"user: {user['servicecalls']}")
+    logger.debug(f"user: {employee.servicecalls}")
 
     await callback.answer()
     send_message_for_search = await callback.message.answer(MessageTemplates.LOADING_REQUESTS)
 
-    my_scs: list = user['servicecalls']
+    my_scs: list = employee.servicecalls
 
     if not my_scs:
         await callback.answer()
@@ -59,13 +118,80 @@ async def paginate_scs_logic(
         await callback.message.answer(MessageTemplates.NO_CREATED_ISSUES)
         return {}
 
-    results = await ItiliumBaseApi.get_task_for_async_find_sc_by_id(scs=my_scs, callback=callback)
-
-    await paginate_dto.set_cache_scs(results)
+    # Кэшируем только номера заявок: данные заявок запрашиваются постранично в load_scs_page
+    await paginate_dto.set_items(my_scs)
 
     return {"send_message_for_search": send_message_for_search}
 
 
+async def fetch_scs_list_items(
+    callback: types.CallbackQuery,
+    paginate_dto: PaginateScsDTO,
+    sc_numbers: list,
+) -> dict[str, dict]:
+    """
+    Возвращает элементы списка (номер и тема) по номерам заявок: из кэша, а недостающие - из Итилиума
+    (с сохранением в кэш). Ненайденные заявки и ошибки в кэш не попадают
+    """
+    list_items = await paginate_dto.get_cache_list_items(sc_numbers)
+    missing = [sc_number for sc_number in sc_numbers if sc_number not in list_items]
+    if not missing:
+        return list_items
+
+    results = await ItiliumBaseApi.get_task_for_async_find_sc_by_id(scs=missing, callback=callback)
+    fetched = {result.item: result.value for result in results if result.ok and isinstance(result.value, dict)}
+    if len(fetched) != len(missing):
+        logger.warning(f"find_sc: получено {len(fetched)} из {len(missing)} заявок для {callback.from_user.id}")
+
+    await paginate_dto.set_cache_list_items(fetched)
+    list_items.update((sc_number, sc_list_projection(sc)) for sc_number, sc in fetched.items())
+    return list_items
+
+
+async def load_scs_page(
+    callback: types.CallbackQuery,
+    paginate_dto: PaginateScsDTO,
+    page_numbers: list,
+    page: int,
+    total: int,
+) -> list[dict]:
+    """
+    Загружает данные заявок только для страницы page (page_numbers - номера заявок этой страницы,
+    total - длина всего списка). Если включено SC_PAGE_PREFETCH_ENABLED, следующая страница загружается в фоне
+    """
+    list_items = await fetch_scs_list_items(callback, paginate_dto, page_numbers)
+
+    if settings.SC_PAGE_PREFETCH_ENABLED and (page + 1) * Helpers.PAGE_SIZE < total:
+        schedule_scs_page_prefetch(callback, paginate_dto, page + 1)
+
+    return [
+        list_items.get(sc_number) or sc_placeholder(sc_number)
+        for sc_number in page_numbers
+    ]
+
+
+def schedule_scs_page_prefetch(
+    callback: types.CallbackQuery,
+    paginate_dto: PaginateScsDTO,
+    page: int,
+) -> None:
+    """Запускает фоновую загрузку страницы page, если она еще не выполняется"""
+    key = (callback.from_user.id, page)
+    if key in _prefetch_tasks:
+        return
+
+    async def prefetch():
+        try:
+            page_numbers, _ = await paginate_dto.get_page(page, Helpers.PAGE_SIZE)
+            await fetch_scs_list_items(callback, paginate_dto, page_numbers)
+        except Exception as e:
+            logger.warning(f"Не удалось предзагрузить страницу {page} заявок {callback.from_user.id}: {e}")
+
+    task = asyncio.create_task(prefetch())
+    _prefetch_tasks[key] = task
+    task.add_done_callback(lambda _: _prefetch_tasks.pop(key, None))
+
+
 async def paginate_responsible_scs_logic(
     callback: types.CallbackQuery,
     paginate_dto: PaginateResponsibleScsDTO,
@@ -85,11 +211,76 @@ async def paginate_responsible_scs_logic(
 
     results = await ItiliumBaseApi.get_task_for_async_find_sc_by_id(scs=my_scs, callback=callback)
 
-    await paginate_dto.set_cache_responsible_scs(results)
+    await paginate_dto.set_items(collect_found_scs(results))
 
     return {"send_message_for_search": send_message_for_search}
 
 
+async def show_responsible_scs_progressively(
+    callback: types.CallbackQuery,
+    paginate_dto: PaginateResponsibleScsDTO,
+) -> None:
+    """
+    Загружает заявки в ответственности и выводит список по мере поступления данных.
+    Сообщение о загрузке заменяется первой страницей, как только загружены ее заявки, затем счетчик
+    загруженных заявок обновляется не чаще PROGRESSIVE_RENDER_INTERVAL. После загрузки список кэшируется
+    и выводится с постраничной навигацией
+    """
+    response: Response = await ItiliumBaseApi.scs_responsibility_tasks(callback.from_user.id)
+
+    my_scs = json.loads(response.text)
+
+    list_message = await callback.message.answer(MessageTemplates.LOADING_REQUESTS)
+
+    if not my_scs:
+        await list_message.edit_text(MessageTemplates.NO_RESPONSIBLE_ISSUES)
+        return
+
+    resolved: list[FanOutResult | None] = [None] * len(my_scs)
+    progress = {"loaded": 0, "found": 0}
+
+    async def render_progress():
+        page_scs = [
+            entry for entry in (sc_list_entry(result) for result in resolved if result is not None)
+            if entry is not None
+        ][:Helpers.PAGE_SIZE]
+        await list_message.edit_text(
+            text=MessageFormatter.loading_progress(
+                MessageTemplates.RESPONSIBLE_REQUESTS, progress["loaded"], len(my_scs)
+            ),
+            # Без кнопок навигации: следующие страницы доступны после загрузки всего списка
+            reply_markup=await Helpers.get_paginated_kb_responsible_scs(page_scs, 0, len(page_scs))
+        )
+
+    renderer = ThrottledRenderer(render_progress, settings.PROGRESSIVE_RENDER_INTERVAL)
+
+    def on_result(index: int, result: FanOutResult) -> None:
+        resolved[index] = result
+        progress["loaded"] += 1
+        if sc_list_entry(result) is not None:
+            progress["found"] += 1
+        # Первая отрисовка - когда готова первая страница, дальше обновляется счетчик загруженных
+        if progress["found"] >= Helpers.PAGE_SIZE:
+            renderer.request()
+
+    results = await ItiliumBaseApi.get_task_for_async_find_sc_by_id(
+        scs=my_scs,
+        callback=callback,
+        on_result=on_result
+    )
+
+    scs = collect_found_scs(results)
+    await paginate_dto.set_items(scs)
+
+    async def render_final():
+        await list_message.edit_text(
+            text=MessageTemplates.RESPONSIBLE_REQUESTS,
+            reply_markup=await Helpers.get_paginated_kb_responsible_scs(scs)
+        )
+
+    await renderer.flush(render_final)
+
+
 async def paginate_teams_logic(
     callback: types.CallbackQuery,
     paginate_dto: PaginateTeamsDTO,
@@ -101,11 +292,7 @@ async def paginate_teams_logic(
     send_message_for_search = await callback.message.answer("Загружаю подразделения...")
 
     try:
-        response = await ItiliumBaseApi.get_responsibles(callback.from_user.id, paginate_dto.sc_number)
-        if response.status_code == 200:
-            responsibles_data = response.json()
-            await paginate_dto.set_cache_teams(responsibles_data)
-        else:
+        if await load_responsibles(callback.from_user.id, paginate_dto) is None:
             await callback.message.answer("Ошибка получения подразделений")
             return {}
     except Exception as e:
@@ -113,4 +300,39 @@ async def paginate_teams_logic(
         await callback.message.answer("Ошибка получения подразделений")
         return {}
 
-    return {"send_message_for_search": send_message_for_search}
\ No newline at end of file
+    return {"send_message_for_search": send_message_for_search}
+
+async def load_responsibles(user_id: int, paginate_dto: PaginateTeamsDTO) -> list | None:
+    """
+    Запрашивает дерево ответственных по заявке и кэширует его вместе с индексами.
+    Возвращает подразделения или None, если Итилиум ответил ошибкой
+    """
+    response = await ItiliumBaseApi.get_responsibles(user_id, paginate_dto.sc_number)
+    if response.status_code != 200:
+        return None
+    teams = response.json()
+    await paginate_dto.set_items(teams)
+    return teams
+
+
+async def get_responsible_team(user_id: int, paginate_dto: PaginateTeamsDTO, team_id: str) -> dict | None:
+    """
+    Подразделение (со списком сотрудников) из кэша дерева ответственных.
+    Если кэш истек, дерево запрашивается заново
+    """
+    team = await paginate_dto.get_team(team_id)
+    if team is None:
+        teams = await load_responsibles(user_id, paginate_dto)
+        team = PaginateTeamsDTO.index_teams(teams or []).get(team_id)
+    return team
+
+
+async def get_responsible_employee(user_id: int, paginate_dto: PaginateTeamsDTO, employee_id: str) -> dict | None:
+    """
+    Сотрудник из кэша дерева ответственных. Если кэш истек, дерево запрашивается заново
+    """
+    employee = await paginate_dto.get_employee(employee_id)
+    if employee is None:
+        teams = await load_responsibles(user_id, paginate_dto)
+        employee = PaginateTeamsDTO.index_employees(teams or []).get(employee_id)
+    return employee
@@ -1,4 +1,10 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
 from aiogram import Bot
+
+from config.configuration import settings
+from services.employee_cache import employee_cache
 from utils.logger_project import setup_logger
 
 logger = setup_logger(__name__)
@@ -6,3 +12,41 @@ logger = setup_logger(__name__)
 
 async def every_minutes(bot: Bot):
     await bot.send_message(chat_id=123456789, text="Я работаю каждую минуту")
+
+
+async def prewarm_employee_cache():
+    """
+    Прогрев кэша авторизации сотрудников, обращавшихся к боту за последние EMPLOYEE_PREWARM_ACTIVE_DAYS дней.
+    Запросы в Итилиум выполняются с ограничением параллельности EMPLOYEE_PREWARM_CONCURRENCY.
+    Пользователи со свежей записью в кэше и с отказом (401/403) пропускаются.
+    """
+    since = datetime.now(timezone.utc) - timedelta(days=settings.EMPLOYEE_PREWARM_ACTIVE_DAYS)
+
+    try:
+        telegram_ids = await employee_cache.get_recently_active(since.timestamp(), settings.EMPLOYEE_PREWARM_LIMIT)
+    except Exception as e:
+        logger.error(f"Прогрев кэша сотрудников: не удалось получить активных пользователей: {e}")
+        return
+
+    logger.info(f"Прогрев кэша сотрудников: найдено активных пользователей {len(telegram_ids)}")
+
+    semaphore = asyncio.Semaphore(settings.EMPLOYEE_PREWARM_CONCURRENCY)
+    stats = {"warmed": 0, "skipped": 0, "failed": 0}
+
+    async def warm(telegram_id: int):
+        async with semaphore:
+            try:
+                if await employee_cache.prewarm(telegram_id):
+                    stats["warmed"] += 1
+                else:
+                    stats["skipped"] += 1
+            except Exception as e:
+                stats["failed"] += 1
+                logger.warning(f"Прогрев кэша сотрудников: ошибка для {telegram_id}: {e}")
+
+    await asyncio.gather(*(warm(telegram_id) for telegram_id in telegram_ids))
+
+    logger.info(
+        f"Прогрев кэша сотрудников завершен. Обновлено: {stats['warmed']}, "
+        f"пропущено: {stats['skipped']}, ошибок: {stats['failed']}"
+    )
@@ -0,0 +1,16 @@
+import os
+
+# Обязательные переменные окружения config.configuration: модули читают settings при импорте
+for name, value in {
+    "TOKEN": "123456:test",
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "POSTGRES_DB": "test",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_HOST": "localhost",
+    "ITILIUM_URL": "http://itilium.test",
+    "ITILIUM_LOGIN": "test",
+    "ITILIUM_PASSWORD": "test",
+    "REDIS_HOST": "localhost",
+}.items():
+    os.environ.setdefault(name, value)
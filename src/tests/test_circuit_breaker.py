@@ -0,0 +1,125 @@
+import httpx
+import pytest
+
+from utils import circuit_breaker
+from utils.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry, CircuitOpenError, CircuitState
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", fake)
+    return fake
+
+
+def make_breaker(**kwargs) -> CircuitBreaker:
+    params = {"failure_threshold": 3, "recovery_timeout": 30, "half_open_max_calls": 1}
+    params.update(kwargs)
+    return CircuitBreaker("find_sc", **params)
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = make_breaker()
+
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.transitions["closed->open"] == 1
+
+
+def test_success_resets_failure_count(clock):
+    breaker = make_breaker()
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_open_rejects_calls_until_recovery_timeout(clock):
+    breaker = make_breaker(failure_threshold=1)
+    breaker.record_failure()
+
+    clock.now += 10
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.before_call()
+    assert error.value.retry_after == pytest.approx(20)
+    assert breaker.rejected == 1
+
+    clock.now += 20
+    assert breaker.state == CircuitState.HALF_OPEN
+
+
+def test_half_open_limits_probe_calls(clock):
+    breaker = make_breaker(failure_threshold=1, half_open_max_calls=1)
+    breaker.record_failure()
+    clock.now += 30
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    # Отмененный пробный запрос возвращает слот
+    breaker.release()
+    breaker.before_call()
+
+
+def test_half_open_success_closes(clock):
+    breaker = make_breaker(failure_threshold=1)
+    breaker.record_failure()
+    clock.now += 30
+
+    breaker.before_call()
+    breaker.record_success()
+
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.transitions == {"closed->open": 1, "open->half_open": 1, "half_open->closed": 1}
+
+
+def test_half_open_failure_reopens(clock):
+    breaker = make_breaker(failure_threshold=3)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 30
+
+    breaker.before_call()
+    breaker.record_failure()
+
+    # Одной ошибки пробного запроса достаточно, отсчет recovery_timeout начинается заново
+    assert breaker.state == CircuitState.OPEN
+    clock.now += 29
+    assert breaker.state == CircuitState.OPEN
+    clock.now += 1
+    assert breaker.state == CircuitState.HALF_OPEN
+
+
+def test_only_server_errors_are_failures():
+    assert CircuitBreaker.is_failure_response(httpx.Response(500))
+    assert CircuitBreaker.is_failure_response(httpx.Response(503))
+    assert not CircuitBreaker.is_failure_response(httpx.Response(404))
+    assert not CircuitBreaker.is_failure_response(httpx.Response(200))
+
+
+def test_registry_groups_by_endpoint():
+    registry = CircuitBreakerRegistry(failure_threshold=1, recovery_timeout=30)
+
+    breaker = registry.for_url("http://itilium.test/hs/bot/find_sc?telegram=1&sc_number=2")
+
+    assert breaker is registry.for_url("http://itilium.test/hs/bot/find_sc?telegram=3&sc_number=4")
+    assert breaker is not registry.for_url("http://itilium.test/hs/bot/find_employee")
+    assert breaker.name == "find_sc"
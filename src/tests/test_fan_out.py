@@ -0,0 +1,112 @@
+import asyncio
+
+from utils.fan_out import FanOutExecutor
+
+
+def test_results_keep_item_order():
+    executor = FanOutExecutor(max_concurrency=10, per_key_concurrency=10)
+
+    async def func(item):
+        # Первые элементы завершаются последними
+        await asyncio.sleep(0.01 * (5 - item))
+        return item * 10
+
+    results = asyncio.run(executor.map("user", func, range(5)))
+
+    assert [result.item for result in results] == [0, 1, 2, 3, 4]
+    assert [result.value for result in results] == [0, 10, 20, 30, 40]
+    assert all(result.ok for result in results)
+
+
+def test_per_key_and_global_concurrency_limits():
+    executor = FanOutExecutor(max_concurrency=3, per_key_concurrency=2)
+    running = {"user-1": 0, "user-2": 0, "total": 0}
+    peak = {"user-1": 0, "user-2": 0, "total": 0}
+
+    def make_func(key):
+        async def func(item):
+            for name in (key, "total"):
+                running[name] += 1
+                peak[name] = max(peak[name], running[name])
+            await asyncio.sleep(0.01)
+            for name in (key, "total"):
+                running[name] -= 1
+            return item
+        return func
+
+    async def main():
+        await asyncio.gather(
+            executor.map("user-1", make_func("user-1"), range(6)),
+            executor.map("user-2", make_func("user-2"), range(6)),
+        )
+
+    asyncio.run(main())
+
+    assert peak["user-1"] == 2
+    assert peak["user-2"] == 2
+    assert peak["total"] == 3
+    # Семафоры ключей удаляются, когда вызовы map для ключа завершены
+    assert executor._per_key == {}
+
+
+def test_timeout_applies_to_each_call_not_to_waiting_in_queue():
+    # 4 элемента по 0.05 с выполняются строго по одному: вместе дольше таймаута, но каждый укладывается
+    executor = FanOutExecutor(max_concurrency=10, per_key_concurrency=1, timeout=0.1)
+
+    async def func(item):
+        await asyncio.sleep(0.05)
+        return item
+
+    results = asyncio.run(executor.map("user", func, range(4)))
+
+    assert all(result.ok for result in results)
+
+
+def test_slow_item_times_out_and_errors_are_returned():
+    executor = FanOutExecutor(max_concurrency=10, per_key_concurrency=10, timeout=0.05)
+
+    async def func(item):
+        if item == "slow":
+            await asyncio.sleep(1)
+        if item == "broken":
+            raise RuntimeError("boom")
+        return item
+
+    results = asyncio.run(executor.map("user", func, ["ok", "slow", "broken"]))
+
+    assert results[0].ok and results[0].value == "ok"
+    assert isinstance(results[1].error, TimeoutError)
+    assert isinstance(results[2].error, RuntimeError)
+
+
+def test_timeout_argument_overrides_default():
+    executor = FanOutExecutor(max_concurrency=10, per_key_concurrency=10, timeout=0.01)
+
+    async def func(item):
+        await asyncio.sleep(0.05)
+        return item
+
+    results = asyncio.run(executor.map("user", func, [1], timeout=1))
+
+    assert results[0].ok
+
+
+def test_on_result_is_called_for_every_item():
+    executor = FanOutExecutor(max_concurrency=10, per_key_concurrency=10)
+    seen = {}
+
+    async def func(item):
+        if item == 2:
+            raise ValueError(item)
+        return item
+
+    def on_result(index, result):
+        seen[index] = result.ok
+        if index == 0:
+            # Ошибка в on_result не влияет на остальные элементы
+            raise RuntimeError("callback failed")
+
+    results = asyncio.run(executor.map("user", func, [0, 1, 2], on_result=on_result))
+
+    assert seen == {0: True, 1: True, 2: False}
+    assert [result.ok for result in results] == [True, True, False]
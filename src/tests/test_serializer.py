@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from utils.serializer import Serializer
+
+VALUE = {"number": "SC-1", "shortDescription": "Не работает принтер", "files": [1, 2.5, None, True]}
+
+
+@pytest.mark.parametrize("compression", ["none", "zlib"])
+def test_json_round_trip(compression):
+    serializer = Serializer(codec="json", compression=compression, compression_threshold=0)
+
+    assert serializer.loads(serializer.dumps(VALUE)) == VALUE
+
+
+def test_msgpack_lz4_round_trip():
+    pytest.importorskip("msgpack")
+    pytest.importorskip("lz4")
+    serializer = Serializer(codec="msgpack", compression="lz4", compression_threshold=0)
+
+    assert serializer.loads(serializer.dumps(VALUE)) == VALUE
+
+
+def test_header_describes_codec_and_compression():
+    serializer = Serializer(codec="json", compression="zlib", compression_threshold=0)
+
+    payload = serializer.dumps(VALUE)
+
+    assert payload[0] == Serializer.FORMAT_VERSION
+    assert payload[1] == 0 | 1 << 4
+
+
+def test_small_values_are_not_compressed():
+    serializer = Serializer(codec="json", compression="zlib", compression_threshold=1024)
+
+    payload = serializer.dumps(VALUE)
+
+    assert payload[1] >> 4 == 0
+    assert serializer.loads(payload) == VALUE
+
+
+def test_reader_ignores_own_settings():
+    # Реплика с другими настройками читает значение по заголовку
+    writer = Serializer(codec="json", compression="zlib", compression_threshold=0)
+    reader = Serializer(codec="json", compression="none")
+
+    assert reader.loads(writer.dumps(VALUE)) == VALUE
+
+
+@pytest.mark.parametrize("legacy", [
+    json.dumps(VALUE),
+    json.dumps(VALUE).encode(),
+    json.dumps(VALUE, ensure_ascii=False).encode(),
+])
+def test_legacy_json_without_header(legacy):
+    assert Serializer().loads(legacy) == VALUE
+
+
+def test_unknown_flags_are_rejected():
+    with pytest.raises(ValueError):
+        Serializer().loads(bytes((Serializer.FORMAT_VERSION, 0x0F)) + b"{}")
+
+
+def test_invalid_settings_are_rejected():
+    with pytest.raises(ValueError):
+        Serializer(codec="pickle")
+    with pytest.raises(ValueError):
+        Serializer(compression="brotli")
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from utils.single_flight import SingleFlight, single_flight
+
+
+def test_concurrent_calls_share_one_execution():
+    group = SingleFlight()
+    calls = []
+
+    async def load(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return f"value-{key}"
+
+    async def main():
+        return await asyncio.gather(
+            group.do("a", load, "a"),
+            group.do("a", load, "a"),
+            group.do("b", load, "b"),
+        )
+
+    assert asyncio.run(main()) == ["value-a", "value-a", "value-b"]
+    assert sorted(calls) == ["a", "b"]
+
+
+def test_sequential_calls_execute_again():
+    group = SingleFlight()
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return len(calls)
+
+    async def main():
+        first = await group.do("key", load)
+        assert not group.in_flight("key")
+        second = await group.do("key", load)
+        return first, second
+
+    assert asyncio.run(main()) == (1, 2)
+
+
+def test_exception_is_raised_for_every_waiter():
+    group = SingleFlight()
+
+    async def load():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        return await asyncio.gather(group.do("key", load), group.do("key", load), return_exceptions=True)
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    group = SingleFlight()
+
+    async def load():
+        await asyncio.sleep(0.02)
+        return "value"
+
+    async def main():
+        first = asyncio.create_task(group.do("key", load))
+        second = asyncio.create_task(group.do("key", load))
+        await asyncio.sleep(0.005)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "value"
+
+
+def test_decorator_normalizes_arguments():
+    calls = []
+
+    @single_flight("find")
+    async def find(identifier, attribute="telegram"):
+        calls.append((identifier, attribute))
+        await asyncio.sleep(0.01)
+        return identifier
+
+    async def main():
+        return await asyncio.gather(
+            find(1),
+            find(identifier=1),
+            find(1, "telegram"),
+            find(1, attribute="phone"),
+        )
+
+    assert asyncio.run(main()) == [1, 1, 1, 1]
+    assert sorted(calls) == [(1, "phone"), (1, "telegram")]
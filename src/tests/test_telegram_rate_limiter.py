@@ -0,0 +1,92 @@
+import pytest
+
+from utils import telegram_rate_limiter
+from utils.telegram_rate_limiter import OutgoingRateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Общий модуль time: часы подменяются и для бакетов, и для TTL в LRUCache
+    fake = FakeClock()
+    monkeypatch.setattr(telegram_rate_limiter.time, "monotonic", fake)
+    return fake
+
+
+def test_burst_then_wait_for_next_token(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+
+    assert [bucket.try_acquire() for _ in range(3)] == [0, 0, 0]
+    assert bucket.try_acquire() == pytest.approx(0.5)
+
+
+def test_refill_is_capped_by_capacity(clock):
+    bucket = TokenBucket(rate=1, capacity=3)
+    for _ in range(3):
+        bucket.try_acquire()
+
+    clock.now += 1.5
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(0.5)
+
+    clock.now += 100
+    assert [bucket.try_acquire() for _ in range(3)] == [0, 0, 0]
+    assert bucket.try_acquire() > 0
+
+
+def test_pause_blocks_tokens_and_empties_bucket(clock):
+    bucket = TokenBucket(rate=1, capacity=3)
+
+    bucket.pause(10)
+    assert bucket.paused_for() == pytest.approx(10)
+    assert bucket.try_acquire() == pytest.approx(10)
+
+    clock.now += 10
+    # После паузы бакет наполняется с нуля
+    assert bucket.try_acquire() == pytest.approx(1)
+    clock.now += 1
+    assert bucket.try_acquire() == 0
+
+
+def test_shorter_pause_does_not_shorten_longer_one(clock):
+    bucket = TokenBucket(rate=1, capacity=3)
+
+    bucket.pause(10)
+    bucket.pause(2)
+
+    assert bucket.paused_for() == pytest.approx(10)
+
+
+def test_idle_ttl_covers_pause_and_refill(clock):
+    bucket = TokenBucket(rate=0.5, capacity=3)
+    assert bucket.idle_ttl() == pytest.approx(6)
+
+    bucket.pause(100)
+    assert bucket.idle_ttl() == pytest.approx(106)
+
+
+def test_paused_chat_bucket_survives_idle_period(clock):
+    limiter = OutgoingRateLimiter(global_rate=30, chat_rate=1, chat_burst=3, max_retries=3)
+    bucket = limiter._chat_bucket(42)
+    bucket.pause(300)
+    limiter._touch_chat_bucket(42, bucket)
+
+    clock.now += 299
+    assert limiter._chat_bucket(42) is bucket
+    assert bucket.try_acquire() == pytest.approx(1)
+
+
+def test_idle_chat_bucket_is_evicted_once_full(clock):
+    limiter = OutgoingRateLimiter(global_rate=30, chat_rate=1, chat_burst=3, max_retries=3)
+    bucket = limiter._chat_bucket(42)
+    bucket.try_acquire()
+
+    clock.now += 3
+    assert limiter._chat_bucket(42) is not bucket
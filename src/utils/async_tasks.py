@@ -0,0 +1,40 @@
+import asyncio
+import logging
+from typing import Any, Awaitable
+
+logger = logging.getLogger(__name__)
+
+# Ссылки на фоновые задачи: без них задача может быть удалена сборщиком мусора до завершения
+_background_tasks: set[asyncio.Task] = set()
+
+
+async def gather_safe(*aws: Awaitable[Any], description: str = "") -> list[Any]:
+    """
+    Выполняет независимые вызовы одновременно (например, удаление нескольких сообщений).
+    Ошибки не выбрасываются, а логируются; на месте неудачного вызова в результате будет исключение
+    """
+    results = await asyncio.gather(*aws, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning(f"Не выполнено {description or 'фоновое действие'}: {type(result).__name__}: {result}")
+    return results
+
+
+def fire_and_forget(*aws: Awaitable[Any], description: str = "") -> asyncio.Task:
+    """
+    Запускает вызовы в фоне, не дожидаясь их (удаление служебных сообщений, callback.answer).
+    Ответ пользователю не ждет вспомогательных запросов к Telegram, ошибки логируются
+    """
+    task = asyncio.create_task(gather_safe(*aws, description=description))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def wait_background_tasks(timeout: float = 5) -> None:
+    """Дожидается фоновых вызовов при остановке приложения (не дольше timeout секунд)"""
+    if not _background_tasks:
+        return
+    _, pending = await asyncio.wait(set(_background_tasks), timeout=timeout)
+    if pending:
+        logger.warning(f"Не завершено фоновых вызовов при остановке: {len(pending)}")
@@ -1,29 +1,81 @@
+import asyncio
 import logging
 import json
+import uuid
 from typing import Any, Optional, Dict
 from datetime import datetime, timedelta
 from functools import wraps
 
+from config.configuration import settings
 from utils.db_redis import async_redis_client
+from utils.lru_cache import LRUCache
+from utils.serializer import serializer
 
 logger = logging.getLogger(__name__)
 
 
 class CacheManager:
-    """Менеджер кэширования для оптимизации запросов"""
-    
-    def __init__(self):
+    """
+    Менеджер кэширования для оптимизации запросов.
+
+    Первый уровень (L1) - LRU с TTL в памяти процесса, второй (L2) - Redis, общий для всех реплик бота.
+    set и delete публикуют ключи в канал INVALIDATION_CHANNEL, и остальные реплики удаляют их из своего L1.
+    TTL записи L1 не больше l1_ttl, поэтому пропущенное сообщение об инвалидации устаревает не дольше него.
+    Значения из L1 отдаются без копирования, изменять их нельзя.
+
+    Если Redis недоступен, set сохраняет значение только в L1 на полный TTL (деградированный режим),
+    чтобы кэш продолжал работать в пределах процесса. После восстановления подписки на канал
+    инвалидации L1 очищается: записи деградированного режима и пропущенные инвалидации не переживают ее.
+    """
+
+    INVALIDATION_CHANNEL = "cache:invalidate"
+    # Пауза перед повторной подпиской на канал инвалидации после ошибки
+    LISTENER_RETRY_DELAY = 5
+
+    def __init__(self, l1_enabled: bool = True, l1_max_size: int = 5000, l1_ttl: float = 30):
         self.default_ttl = 300  # 5 минут по умолчанию
-    
+        self.l1_enabled = l1_enabled
+        self.l1_ttl = l1_ttl
+        self._local = LRUCache(max_size=l1_max_size, ttl=l1_ttl)
+        # Идентификатор реплики: свои сообщения об инвалидации игнорируются
+        self.instance_id = uuid.uuid4().hex
+        self._listener_task: Optional[asyncio.Task] = None
+
+    def _set_local(self, key: str, value: Any, ttl_ms: Optional[int]) -> None:
+        """Сохраняет значение в L1 на срок не больше оставшегося TTL в Redis"""
+        if not self.l1_enabled:
+            return
+        ttl = self.l1_ttl
+        if ttl_ms is not None and ttl_ms > 0:
+            ttl = min(ttl, ttl_ms / 1000)
+        self._local.set(key, value, ttl=ttl)
+
+    def _set_degraded(self, key: str, value: Any, ttl: int) -> None:
+        """Сохраняет значение только в L1, пока Redis недоступен"""
+        if self.l1_enabled:
+            self._local.set(key, value, ttl=ttl)
+
+    def _invalidation_message(self, keys: tuple[str, ...]) -> str:
+        return json.dumps({"sender": self.instance_id, "keys": list(keys)})
+
     async def get(self, key: str) -> Optional[Any]:
         """Получает данные из кэша"""
+        if self.l1_enabled:
+            value = self._local.get(key)
+            if value is not None:
+                return value
         try:
-            redis_client = await async_redis_client.get_client()
+            redis_client = await async_redis_client.get_binary_client()
             if redis_client is None:
                 return None  # Если Redis недоступен, возвращаем None
-            data = await redis_client.get(key)
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.pttl(key)
+                data, ttl_ms = await pipe.execute()
             if data:
-                return json.loads(data)
+                value = serializer.loads(data)
+                self._set_local(key, value, ttl_ms)
+                return value
             return None
         except Exception as e:
             logger.error(f"Ошибка получения из кэша {key}: {e}")
@@ -31,31 +83,49 @@ class CacheManager:
     
     async def set(self, key: str, value: Any, ttl: int = None) -> bool:
         """Сохраняет данные в кэш"""
+        ttl = ttl or self.default_ttl
+        # Старое значение в L1 не должно пережить неудачную запись
+        self._local.delete(key)
         try:
-            redis_client = await async_redis_client.get_client()
+            redis_client = await async_redis_client.get_binary_client()
             if redis_client is None:
-                return False  # Если Redis недоступен, возвращаем False
-            ttl = ttl or self.default_ttl
-            await redis_client.setex(key, ttl, json.dumps(value))
+                # Если Redis недоступен, кэшируем в памяти процесса и возвращаем False
+                self._set_degraded(key, value, ttl)
+                return False
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.setex(key, ttl, serializer.dumps(value))
+                pipe.publish(self.INVALIDATION_CHANNEL, self._invalidation_message((key,)))
+                await pipe.execute()
+            self._set_local(key, value, ttl * 1000)
             return True
         except Exception as e:
             logger.error(f"Ошибка сохранения в кэш {key}: {e}")
+            self._set_degraded(key, value, ttl)
             return False
     
-    async def delete(self, key: str) -> bool:
-        """Удаляет данные из кэша"""
+    async def delete(self, *keys: str) -> bool:
+        """Удаляет данные из кэша (одним запросом для нескольких ключей)"""
+        if not keys:
+            return True
+        for key in keys:
+            self._local.delete(key)
         try:
-            redis_client = await async_redis_client.get_client()
+            redis_client = await async_redis_client.get_binary_client()
             if redis_client is None:
                 return False  # Если Redis недоступен, возвращаем False
-            await redis_client.delete(key)
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.delete(*keys)
+                pipe.publish(self.INVALIDATION_CHANNEL, self._invalidation_message(keys))
+                await pipe.execute()
             return True
         except Exception as e:
-            logger.error(f"Ошибка удаления из кэша {key}: {e}")
+            logger.error(f"Ошибка удаления из кэша {keys}: {e}")
             return False
     
     async def exists(self, key: str) -> bool:
         """Проверяет существование ключа в кэше"""
+        if self.l1_enabled and key in self._local:
+            return True
         try:
             redis_client = await async_redis_client.get_client()
             if redis_client is None:
@@ -64,6 +134,66 @@ class CacheManager:
         except Exception as e:
             logger.error(f"Ошибка проверки кэша {key}: {e}")
             return False
+
+    def _handle_invalidation(self, data: str) -> None:
+        try:
+            message = json.loads(data)
+            if message["sender"] == self.instance_id:
+                return
+            keys = message["keys"]
+        except (TypeError, KeyError, json.JSONDecodeError) as e:
+            logger.warning(f"Некорректное сообщение инвалидации кэша: {e}")
+            return
+        for key in keys:
+            self._local.delete(key)
+
+    async def _listen_invalidations(self) -> None:
+        """
+        Подписка на канал инвалидации. Пока Redis недоступен, L1 работает сам по себе (деградированный режим).
+        При каждой успешной подписке L1 очищается: сообщения, пришедшие без подписки, потеряны
+        """
+        while True:
+            redis_client = await async_redis_client.get_client()
+            if redis_client is None:
+                await asyncio.sleep(self.LISTENER_RETRY_DELAY)
+                continue
+
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.INVALIDATION_CHANNEL)
+                self._local.clear()
+                logger.info(f"Подписка на канал инвалидации кэша {self.INVALIDATION_CHANNEL}")
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._handle_invalidation(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка подписки на канал инвалидации кэша: {e}")
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception as e:
+                    logger.debug(f"Ошибка закрытия подписки на канал инвалидации: {e}")
+            await asyncio.sleep(self.LISTENER_RETRY_DELAY)
+
+    def start_invalidation_listener(self) -> None:
+        """Запускает фоновую подписку на инвалидацию L1 (нужна, если запущено несколько реплик бота)"""
+        if not self.l1_enabled:
+            return
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen_invalidations())
+
+    async def stop_invalidation_listener(self) -> None:
+        """Останавливает подписку на инвалидацию"""
+        if self._listener_task is None:
+            return
+        self._listener_task.cancel()
+        try:
+            await self._listener_task
+        except asyncio.CancelledError:
+            pass
+        self._listener_task = None
     
     def generate_key(self, prefix: str, *args, **kwargs) -> str:
         """Генерирует ключ кэша"""
@@ -81,7 +211,11 @@ class CacheManager:
 
 
 # Глобальный экземпляр менеджера кэша
-cache_manager = CacheManager()
+cache_manager = CacheManager(
+    l1_enabled=settings.CACHE_L1_ENABLED,
+    l1_max_size=settings.CACHE_L1_MAX_SIZE,
+    l1_ttl=settings.CACHE_L1_TTL,
+)
 
 
 def cache_result(prefix: str, ttl: int = 300):
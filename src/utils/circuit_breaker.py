@@ -0,0 +1,169 @@
+import logging
+import time
+from collections import Counter
+from enum import StrEnum
+from typing import Any
+
+import httpx
+
+from config.configuration import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Запрос отклонен без обращения к серверу: предохранитель группы эндпоинтов разомкнут"""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"Предохранитель '{name}' разомкнут, повтор через {retry_after:.1f} с")
+
+
+class CircuitBreaker:
+    """
+    Предохранитель (circuit breaker) для группы эндпоинтов.
+
+    closed - запросы проходят, подряд идущие ошибки считаются. После failure_threshold ошибок
+    предохранитель размыкается (open) и в течение recovery_timeout запросы сразу завершаются CircuitOpenError.
+    half_open - по истечении recovery_timeout пропускается не больше half_open_max_calls пробных запросов:
+    успех замыкает предохранитель, ошибка снова размыкает его.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            failure_threshold: int,
+            recovery_timeout: float,
+            half_open_max_calls: int = 1,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        # Счетчики переходов вида "closed->open" и отклоненных запросов для мониторинга
+        self.transitions: Counter[str] = Counter()
+        self.rejected = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and self._retry_after() <= 0:
+            self._transition(CircuitState.HALF_OPEN)
+        return self._state
+
+    def _retry_after(self) -> float:
+        return self._opened_at + self.recovery_timeout - time.monotonic()
+
+    def _transition(self, state: CircuitState) -> None:
+        if state == self._state:
+            return
+        self.transitions[f"{self._state}->{state}"] += 1
+        log = logger.warning if state == CircuitState.OPEN else logger.info
+        log("Предохранитель '%s': %s -> %s", self.name, self._state, state)
+
+        self._state = state
+        self._half_open_calls = 0
+        if state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+        elif state == CircuitState.CLOSED:
+            self._failures = 0
+
+    def before_call(self) -> None:
+        """Проверяет, можно ли выполнить запрос. Если нет - выбрасывает CircuitOpenError"""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return
+
+        if state == CircuitState.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            return
+
+        self.rejected += 1
+        raise CircuitOpenError(self.name, max(self._retry_after(), 0.0))
+
+    def release(self) -> None:
+        """Возвращает слот пробного запроса, если запрос был отменен, не дождавшись ответа"""
+        if self._state == CircuitState.HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def record_success(self) -> None:
+        if self._state == CircuitState.HALF_OPEN:
+            self._transition(CircuitState.CLOSED)
+        self._failures = 0
+
+    def record_failure(self) -> None:
+        if self._state == CircuitState.HALF_OPEN:
+            self._transition(CircuitState.OPEN)
+            return
+
+        self._failures += 1
+        if self._state == CircuitState.CLOSED and self._failures >= self.failure_threshold:
+            self._transition(CircuitState.OPEN)
+
+    @staticmethod
+    def is_failure_response(response: httpx.Response) -> bool:
+        """Ответы 5xx считаются отказом сервера, 4xx - нет (это ошибка запроса, а не недоступность)"""
+        return response.status_code >= httpx.codes.INTERNAL_SERVER_ERROR
+
+    def snapshot(self) -> dict[str, Any]:
+        """Состояние предохранителя для мониторинга"""
+        return {
+            "state": str(self.state),
+            "failures": self._failures,
+            "rejected": self.rejected,
+            "transitions": dict(self.transitions),
+        }
+
+
+class CircuitBreakerRegistry:
+    """Набор предохранителей по группам эндпоинтов. Группа определяется последним сегментом пути URL"""
+
+    def __init__(self, failure_threshold: int, recovery_timeout: float, half_open_max_calls: int = 1):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    @staticmethod
+    def family(url: str) -> str:
+        """find_sc?telegram=1&sc_number=2 -> find_sc"""
+        path = httpx.URL(url).path.rstrip("/")
+        return path.rsplit("/", 1)[-1] or "/"
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name,
+                failure_threshold=self.failure_threshold,
+                recovery_timeout=self.recovery_timeout,
+                half_open_max_calls=self.half_open_max_calls,
+            )
+            self._breakers[name] = breaker
+        return breaker
+
+    def for_url(self, url: str) -> CircuitBreaker:
+        return self.get(self.family(url))
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Состояние всех предохранителей для мониторинга"""
+        return {name: breaker.snapshot() for name, breaker in self._breakers.items()}
+
+
+# Предохранители для эндпоинтов 1С Итилиум
+itilium_circuit_breakers = CircuitBreakerRegistry(
+    failure_threshold=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    recovery_timeout=settings.CIRCUIT_BREAKER_RECOVERY_TIMEOUT,
+    half_open_max_calls=settings.CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS,
+)
@@ -6,6 +6,19 @@ from config.configuration import settings
 
 logger = logging.getLogger(__name__)
 
+def redis_connection_config(decode_responses: bool = True) -> dict:
+    """Параметры подключения к Redis из настроек (пароль - только если он установлен)"""
+    redis_config = {
+        'host': settings.REDIS_HOST,
+        'port': settings.REDIS_PORT,
+        'db': settings.REDIS_DATABASE,
+        'decode_responses': decode_responses,
+    }
+    if settings.REDIS_PASSWORD:
+        redis_config['password'] = settings.REDIS_PASSWORD
+    return redis_config
+
+
 class AsyncRedisClient:
     _instance = None
 
@@ -13,36 +26,42 @@ class AsyncRedisClient:
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance._client = None
+            cls._instance._binary_client = None
         return cls._instance
 
     async def get_client(self):
         if self._client is None:
-            try:
-                # Создаем подключение к Redis с опциональным паролем
-                redis_config = {
-                    'host': settings.REDIS_HOST,
-                    'port': settings.REDIS_PORT,
-                    'db': settings.REDIS_DATABASE,
-                    'decode_responses': True,
-                }
-                
-                # Добавляем пароль только если он установлен
-                if settings.REDIS_PASSWORD:
-                    redis_config['password'] = settings.REDIS_PASSWORD
-                
-                self._client = redis.Redis(**redis_config)
-                await self._client.ping()
-                logger.info("Connected to Redis successfully.")
-            except TimeoutError:
-                logger.warning('⚠️ Предупреждение. Не удалось подключиться к Redis (таймаут). Бот будет работать без кэширования.')
-                self._client = None
-            except AuthenticationError:
-                logger.warning('⚠️ Предупреждение. Ошибка аутентификации Redis. Бот будет работать без кэширования.')
-                self._client = None
-            except Exception as e:
-                logger.warning(f'⚠️ Предупреждение. Ошибка подключения к Redis: {e}. Бот будет работать без кэширования.')
-                self._client = None
+            self._client = await self._connect(decode_responses=True)
         return self._client
 
+    async def get_binary_client(self):
+        """Клиент без декодирования ответов - для значений кэша (utils.serializer), которые хранятся в байтах"""
+        if self._binary_client is None:
+            self._binary_client = await self._connect(decode_responses=False)
+        return self._binary_client
+
+    async def close(self):
+        """Закрывает оба подключения"""
+        for client in (self._client, self._binary_client):
+            if client is not None:
+                await client.close()
+        self._client = None
+        self._binary_client = None
+
+    @staticmethod
+    async def _connect(decode_responses: bool):
+        try:
+            client = redis.Redis(**redis_connection_config(decode_responses))
+            await client.ping()
+            logger.info("Connected to Redis successfully.")
+            return client
+        except TimeoutError:
+            logger.warning('⚠️ Предупреждение. Не удалось подключиться к Redis (таймаут). Бот будет работать без кэширования.')
+        except AuthenticationError:
+            logger.warning('⚠️ Предупреждение. Ошибка аутентификации Redis. Бот будет работать без кэширования.')
+        except Exception as e:
+            logger.warning(f'⚠️ Предупреждение. Ошибка подключения к Redis: {e}. Бот будет работать без кэширования.')
+        return None
+
 # Экземпляр singleton-клиента
 async_redis_client = AsyncRedisClient()
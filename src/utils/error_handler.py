@@ -3,9 +3,10 @@ import traceback
 from typing import Optional, Callable, Any
 from functools import wraps
 
-from aiogram.types import Message, CallbackQuery
+from aiogram.types import Message, CallbackQuery, ErrorEvent
 from aiogram import Bot
 
+from utils.circuit_breaker import CircuitOpenError
 from utils.message_templates import MessageTemplates
 
 logger = logging.getLogger(__name__)
@@ -17,6 +18,9 @@ class ErrorHandler:
     @staticmethod
     def handle_api_error(error: Exception, context: str = "") -> str:
         """Обрабатывает ошибки API и возвращает понятное сообщение"""
+        if isinstance(error, CircuitOpenError):
+            return MessageTemplates.ITILIUM_ERROR
+
         error_msg = str(error).lower()
         
         if "timeout" in error_msg or "connection" in error_msg:
@@ -132,7 +136,8 @@ def handle_errors(
                     try:
                         await bot.send_message(
                             chat_id=chat_id,
-                            text=default_message
+                            text=MessageTemplates.ITILIUM_ERROR
+                            if isinstance(error, CircuitOpenError) else default_message
                         )
                     except Exception as e:
                         logger.error(f"Не удалось отправить сообщение об ошибке: {e}")
@@ -165,4 +170,26 @@ def handle_telegram_errors(func: Callable) -> Callable:
     return handle_errors(
         context="Telegram",
         default_message="Ошибка взаимодействия с Telegram. Попробуйте позже."
-    )(func) 
\ No newline at end of file
+    )(func)
+
+
+async def circuit_open_error_handler(event: ErrorEvent) -> bool:
+    """
+    Обработчик ошибок диспетчера для CircuitOpenError, не перехваченных в обработчиках:
+    Итилиум недоступен, запрос отклонен предохранителем без ожидания таймаута.
+    """
+    logger.warning(f"Запрос отклонен предохранителем: {event.exception}")
+
+    update = event.update
+    callback = update.callback_query
+    message = update.message or (callback.message if callback else None)
+
+    try:
+        if callback:
+            await callback.answer()
+        if message:
+            await message.answer(MessageTemplates.ITILIUM_ERROR)
+    except Exception as e:
+        logger.error(f"Не удалось отправить сообщение об ошибке: {e}")
+
+    return True
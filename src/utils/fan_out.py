@@ -0,0 +1,108 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional
+
+from config.configuration import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FanOutResult:
+    """Результат обработки одного элемента: значение или ошибка (исключения наружу не выбрасываются)"""
+    item: Any
+    value: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class FanOutExecutor:
+    """
+    Параллельное выполнение однотипных запросов с ограничением параллельности.
+
+    max_concurrency - общий лимит одновременных вызовов для всех пользователей,
+    per_key_concurrency - лимит для одного ключа (пользователя), чтобы один пользователь
+    с сотнями заявок не занимал весь общий лимит.
+    timeout - ограничение времени одного вызова func (ожидание своей очереди в него не входит).
+    Результаты возвращаются в порядке исходных элементов.
+    """
+
+    def __init__(self, max_concurrency: int, per_key_concurrency: int, timeout: Optional[float] = None):
+        self.timeout = timeout
+        self.per_key_concurrency = per_key_concurrency
+        self._global = asyncio.Semaphore(max_concurrency)
+        # Семафоры по ключу и количество использующих их вызовов map (для удаления неиспользуемых)
+        self._per_key: dict[Hashable, tuple[asyncio.Semaphore, int]] = {}
+
+    def _acquire_key(self, key: Hashable) -> asyncio.Semaphore:
+        semaphore, users = self._per_key.get(key, (None, 0))
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_key_concurrency)
+        self._per_key[key] = (semaphore, users + 1)
+        return semaphore
+
+    def _release_key(self, key: Hashable) -> None:
+        semaphore, users = self._per_key[key]
+        if users <= 1:
+            del self._per_key[key]
+        else:
+            self._per_key[key] = (semaphore, users - 1)
+
+    async def map(
+            self,
+            key: Hashable,
+            func: Callable[[Any], Awaitable[Any]],
+            items: Iterable[Any],
+            timeout: Optional[float] = None,
+            on_result: Optional[Callable[[int, FanOutResult], None]] = None,
+    ) -> list[FanOutResult]:
+        """
+        Вызывает func(item) для каждого элемента с учетом общего лимита и лимита по ключу.
+        timeout - ограничение времени каждого вызова func: элемент, не обработанный за это время после
+        получения слота, возвращается с ошибкой TimeoutError. Элементы, ожидающие слота, не прерываются.
+        on_result(index, result) вызывается по мере готовности каждого элемента (в порядке завершения).
+        """
+        items = list(items)
+        timeout = self.timeout if timeout is None else timeout
+        key_semaphore = self._acquire_key(key)
+
+        async def run(index: int, item: Any) -> FanOutResult:
+            try:
+                async with key_semaphore, self._global:
+                    async with asyncio.timeout(timeout or None):
+                        result = FanOutResult(item=item, value=await func(item))
+            except TimeoutError as error:
+                result = FanOutResult(item=item, error=error)
+            except Exception as error:
+                logger.warning("fan-out %s: ошибка для элемента %s: %r", key, item, error)
+                result = FanOutResult(item=item, error=error)
+
+            if on_result is not None:
+                try:
+                    on_result(index, result)
+                except Exception as error:
+                    logger.warning("fan-out %s: ошибка в on_result: %r", key, error)
+            return result
+
+        try:
+            results = await asyncio.gather(*(run(index, item) for index, item in enumerate(items)))
+        finally:
+            self._release_key(key)
+
+        timed_out = sum(isinstance(result.error, TimeoutError) for result in results)
+        if timed_out:
+            logger.warning("fan-out %s: %s из %s элементов не обработаны за отведенное время", key, timed_out, len(items))
+
+        return results
+
+
+# Общий исполнитель для массовых запросов в Итилиум (например, find_sc по списку заявок)
+fan_out_executor = FanOutExecutor(
+    max_concurrency=settings.FAN_OUT_MAX_CONCURRENCY,
+    per_key_concurrency=settings.FAN_OUT_PER_USER_CONCURRENCY,
+    timeout=settings.FAN_OUT_TIMEOUT,
+)
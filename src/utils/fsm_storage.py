@@ -0,0 +1,104 @@
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, Dict
+
+from aiogram.fsm.storage.base import BaseEventIsolation, BaseStorage, DefaultKeyBuilder, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage, SimpleEventIsolation
+from aiogram.fsm.storage.redis import RedisStorage
+from redis.asyncio import Redis
+from redis.exceptions import WatchError
+
+from config.configuration import settings
+from utils.db_redis import redis_connection_config
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value: Any) -> Any:
+    # Даты (например, дата исполнения маркетинговой заявки) сохраняются с тегом и восстанавливаются при чтении
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    raise TypeError(f"Значение типа {type(value).__name__} нельзя сохранить в FSM, сохраняйте идентификаторы")
+
+
+def _json_object_hook(value: dict) -> Any:
+    if len(value) == 1:
+        if "__date__" in value:
+            return date.fromisoformat(value["__date__"])
+        if "__datetime__" in value:
+            return datetime.fromisoformat(value["__datetime__"])
+    return value
+
+
+def fsm_json_dumps(data: Any) -> str:
+    # Компактный JSON без экранирования кириллицы
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=_json_default)
+
+
+def fsm_json_loads(data: str) -> Any:
+    return json.loads(data, object_hook=_json_object_hook)
+
+
+class CompactRedisStorage(RedisStorage):
+    """
+    Хранилище FSM и aiogram_dialog в Redis: состояние переживает перезапуск и доступно всем репликам бота.
+
+    Данные хранятся компактным JSON (даты поддерживаются), у ключей состояния и данных свой TTL,
+    поэтому брошенные сценарии удаляются сами. update_data выполняется как оптимистическая транзакция
+    (WATCH + GET + MULTI/SET/EXEC на одном соединении): одновременные обновления с разных реплик не теряются.
+    """
+
+    UPDATE_RETRIES = 5
+
+    async def update_data(self, key: StorageKey, data: Dict[str, Any]) -> Dict[str, Any]:
+        redis_key = self.key_builder.build(key, "data")
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for _ in range(self.UPDATE_RETRIES):
+                try:
+                    await pipe.watch(redis_key)
+                    value = await pipe.get(redis_key)
+                    current_data = self.json_loads(value.decode() if isinstance(value, bytes) else value) if value else {}
+                    current_data.update(data)
+
+                    pipe.multi()
+                    if current_data:
+                        pipe.set(redis_key, self.json_dumps(current_data), ex=self.data_ttl)
+                    else:
+                        pipe.delete(redis_key)
+                    await pipe.execute()
+                    return current_data.copy()
+                except WatchError:
+                    logger.debug(f"Данные FSM {redis_key} изменены параллельно, повторяем обновление")
+                    continue
+
+        # Ключ постоянно меняется - обновляем без транзакции, как базовое хранилище
+        return await super().update_data(key, data)
+
+
+def create_fsm_storage() -> BaseStorage:
+    """Хранилище FSM по настройке FSM_STORAGE: memory (один процесс) или redis"""
+    if settings.FSM_STORAGE == "redis":
+        logger.info("FSM хранится в Redis")
+        return CompactRedisStorage(
+            redis=Redis(**redis_connection_config(decode_responses=True)),
+            # with_destiny обязателен для aiogram_dialog
+            key_builder=DefaultKeyBuilder(prefix="fsm", with_destiny=True),
+            state_ttl=settings.FSM_STATE_TTL,
+            data_ttl=settings.FSM_DATA_TTL,
+            json_loads=fsm_json_loads,
+            json_dumps=fsm_json_dumps,
+        )
+    return MemoryStorage()
+
+
+def create_events_isolation(storage: BaseStorage) -> BaseEventIsolation:
+    """
+    Изоляция событий одного чата для FSM и aiogram_dialog. В Redis блокировка общая для всех реплик,
+    иначе две реплики одновременно читают и перезаписывают стек диалога
+    """
+    if isinstance(storage, RedisStorage):
+        return storage.create_isolation()
+    return SimpleEventIsolation()
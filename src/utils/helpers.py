@@ -31,6 +31,8 @@ class MLStripper(HTMLParser):
 
 
 class Helpers:
+    # Количество элементов на странице списков с постраничной навигацией
+    PAGE_SIZE: int = 10
 
     def prepare_short_description_for_sc(sc_description: str):
         """
@@ -126,15 +128,24 @@ class Helpers:
         return file_path
 
     @staticmethod
-    async def get_paginated_kb_scs(scs: list, page: int = 0) -> InlineKeyboardMarkup:
+    async def get_paginated_kb_scs(scs: list, page: int = 0, total: int | None = None) -> InlineKeyboardMarkup:
+        """
+        :param scs: весь список заявок или, если передан total, только заявки страницы page
+        :param total: общее количество заявок в списке
+        """
         builder = InlineKeyboardBuilder()
 
-        start_offset = page * 10
-        end_offset = start_offset + 10
-        count_page = len(scs)
+        start_offset = page * Helpers.PAGE_SIZE
+        end_offset = start_offset + Helpers.PAGE_SIZE
 
-        for elem in scs[start_offset:end_offset]:
-            sc = json.loads(elem)
+        if total is None:
+            count_page = len(scs)
+            scs = scs[start_offset:end_offset]
+        else:
+            count_page = total
+
+        for elem in scs:
+            sc = elem if isinstance(elem, dict) else json.loads(elem)
             builder.row(InlineKeyboardButton(
                 text=f"({sc["number"]}) {sc["shortDescription"]}",
                 callback_data=f"show_sc${sc["number"]}"
@@ -155,15 +166,28 @@ class Helpers:
         return builder.as_markup()
 
     @staticmethod
-    async def get_paginated_kb_responsible_scs(scs: list, page: int = 0) -> InlineKeyboardMarkup:
+    async def get_paginated_kb_responsible_scs(
+            scs: list,
+            page: int = 0,
+            total: int | None = None
+    ) -> InlineKeyboardMarkup:
+        """
+        :param scs: весь список заявок или, если передан total, только заявки страницы page
+        :param total: общее количество заявок в списке
+        """
         builder = InlineKeyboardBuilder()
 
-        start_offset = page * 10
-        end_offset = start_offset + 10
-        count_page = len(scs)
+        start_offset = page * Helpers.PAGE_SIZE
+        end_offset = start_offset + Helpers.PAGE_SIZE
+
+        if total is None:
+            count_page = len(scs)
+            scs = scs[start_offset:end_offset]
+        else:
+            count_page = total
 
-        for elem in scs[start_offset:end_offset]:
-            sc = json.loads(elem)
+        for elem in scs:
+            sc = elem if isinstance(elem, dict) else json.loads(elem)
             builder.row(InlineKeyboardButton(
                 text=f"({sc["number"]}) {sc["shortDescription"]}",
                 callback_data=f"show_sc${sc["number"]}"
@@ -184,14 +208,23 @@ class Helpers:
         return builder.as_markup()
 
     @staticmethod
-    async def get_paginated_kb_teams(teams: list, page: int = 0) -> InlineKeyboardMarkup:
+    async def get_paginated_kb_teams(teams: list, page: int = 0, total: int | None = None) -> InlineKeyboardMarkup:
+        """
+        :param teams: весь список подразделений или, если передан total, только подразделения страницы page
+        :param total: общее количество подразделений в списке
+        """
         builder = InlineKeyboardBuilder()
 
-        start_offset = page * 10
-        end_offset = start_offset + 10
-        count_page = len(teams)
+        start_offset = page * Helpers.PAGE_SIZE
+        end_offset = start_offset + Helpers.PAGE_SIZE
+
+        if total is None:
+            count_page = len(teams)
+            teams = teams[start_offset:end_offset]
+        else:
+            count_page = total
 
-        for elem in teams[start_offset:end_offset]:
+        for elem in teams:
             # Проверяем, является ли elem уже словарем или строкой JSON
             if isinstance(elem, dict):
                 team = elem
@@ -1,11 +1,14 @@
 import logging
 import asyncio
+import random
+from dataclasses import dataclass
 from typing import Optional, Any, Dict
 import httpx
 from httpx import AsyncClient, Timeout
 import json as jsonlib
 
 from config.configuration import settings
+from utils.circuit_breaker import CircuitBreaker
 
 logger = logging.getLogger(__name__)
 
@@ -97,6 +100,50 @@ def _format_dict(d: Any) -> str:
     except Exception:
         return str(d)
 
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Политика повторов HTTP-запроса: экспоненциальная задержка с full jitter.
+    Неидемпотентные запросы (POST без ключа идемпотентности) не повторяются.
+    """
+    max_retries: int = 0
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    retry_on_statuses: frozenset[int] = frozenset({429, 502, 503, 504})
+    retry_on_exceptions: tuple[type[Exception], ...] = (httpx.TransportError,)
+    # None - идемпотентность определяется по HTTP-методу
+    idempotent: Optional[bool] = None
+
+    IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+    def can_retry(self, method: str, idempotency_key: Optional[str]) -> bool:
+        """Можно ли повторять запрос с учетом идемпотентности"""
+        if self.max_retries <= 0:
+            return False
+        if idempotency_key:
+            return True
+        if self.idempotent is not None:
+            return self.idempotent
+        return method.upper() in self.IDEMPOTENT_METHODS
+
+    def delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Задержка перед повтором номер attempt (с 0). Учитывает заголовок Retry-After"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+# Политика по умолчанию: повторяются только идемпотентные HTTP-методы
+DEFAULT_RETRY_POLICY = RetryPolicy(
+    max_retries=settings.HTTP_MAX_RETRIES,
+    base_delay=settings.HTTP_RETRY_BASE_DELAY,
+    max_delay=settings.HTTP_RETRY_MAX_DELAY,
+)
+
+
 async def log_and_request(
     method: str,
     url: str,
@@ -105,19 +152,79 @@ async def log_and_request(
     data: Any = None,
     json: Any = None,
     headers: Optional[Dict[str, Any]] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    idempotency_key: Optional[str] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
     **kwargs
 ) -> httpx.Response:
     """
-    Логирует и выполняет HTTP-запрос через общий клиент.
+    Логирует и выполняет HTTP-запрос через общий клиент, повторяя его согласно политике повторов.
     :param method: HTTP-метод (GET, POST, ...)
     :param url: URL запроса
     :param params: Query параметры
     :param data: Тело запроса (form)
     :param json: Тело запроса (json)
     :param headers: Заголовки (дополнительно к дефолтным)
+    :param retry_policy: Политика повторов (по умолчанию DEFAULT_RETRY_POLICY)
+    :param idempotency_key: Ключ идемпотентности. Передается в заголовке Idempotency-Key и разрешает повторы POST
+    :param circuit_breaker: Предохранитель группы эндпоинтов. Если он разомкнут, выбрасывается CircuitOpenError
     :param kwargs: Остальные параметры httpx
     :return: httpx.Response
     """
+    retry_policy = retry_policy or DEFAULT_RETRY_POLICY
+    if idempotency_key:
+        headers = {**(headers or {}), "Idempotency-Key": idempotency_key}
+
+    max_retries = retry_policy.max_retries if retry_policy.can_retry(method, idempotency_key) else 0
+
+    attempt = 0
+    while True:
+        if circuit_breaker is not None:
+            circuit_breaker.before_call()
+        try:
+            response = await _log_and_send(method, url, params, data, json, headers, **kwargs)
+        except asyncio.CancelledError:
+            if circuit_breaker is not None:
+                circuit_breaker.release()
+            raise
+        except Exception as e:
+            if circuit_breaker is not None:
+                circuit_breaker.record_failure()
+            if not isinstance(e, retry_policy.retry_on_exceptions) or attempt >= max_retries:
+                raise
+            delay = retry_policy.delay(attempt)
+            logger.warning(
+                "[HTTP RETRY] %s %s | Ошибка: %r | Повтор %s/%s через %.2f с",
+                method.upper(), url, e, attempt + 1, max_retries, delay
+            )
+        else:
+            if circuit_breaker is not None:
+                if circuit_breaker.is_failure_response(response):
+                    circuit_breaker.record_failure()
+                else:
+                    circuit_breaker.record_success()
+            if response.status_code not in retry_policy.retry_on_statuses or attempt >= max_retries:
+                return response
+            delay = retry_policy.delay(attempt, response)
+            logger.warning(
+                "[HTTP RETRY] %s %s | Status: %s | Повтор %s/%s через %.2f с",
+                method.upper(), url, response.status_code, attempt + 1, max_retries, delay
+            )
+
+        attempt += 1
+        await asyncio.sleep(delay)
+
+
+async def _log_and_send(
+    method: str,
+    url: str,
+    params: Any,
+    data: Any,
+    json: Any,
+    headers: Optional[Dict[str, Any]],
+    **kwargs
+) -> httpx.Response:
+    """Одна попытка HTTP-запроса с логированием запроса и ответа"""
     logger.info("\n[HTTP REQUEST] %s %s\nParams: %s\nData: %s\nJSON: %s\nHeaders: %s",
         method.upper(), url,
         _format_dict(params),
@@ -34,8 +34,11 @@ class MessageTemplates(StrEnum):
     
     # Сообщения о загрузке
     LOADING_REQUESTS = "Запрашиваю заявки, подождите..."
+    LOADING_PROGRESS = "{title}\nЗагружено {loaded} из {total}..."
     NO_CREATED_ISSUES = "У вас нет созданных заявок заявок"
     NO_RESPONSIBLE_ISSUES = "У вас нет заявок в ответственности"
+    SC_DETAILS_UNAVAILABLE = "Не удалось загрузить данные заявки"
+    MARKETING_NOT_ALLOWED = "У вас нет прав на создание заявок в отдел маркетинга"
     
     # Сообщения о пользователях
     USER_NOT_FOUND_ITILIUM = "Вы отсутствуете в Итилиуме. Сообщите администратору ваш id {user_id} для добавления"
@@ -103,6 +106,10 @@ class MessageFormatter:
             # Если не хватает переменной, возвращаем шаблон как есть
             return template
     
+    @staticmethod
+    def loading_progress(title: str, loaded: int, total: int) -> str:
+        return MessageFormatter.format(MessageTemplates.LOADING_PROGRESS, title=title, loaded=loaded, total=total)
+    
     @staticmethod
     def issue_not_found(sc_number: str) -> str:
         return MessageFormatter.format(MessageTemplates.ISSUE_NOT_FOUND, sc_number=sc_number)
@@ -0,0 +1,128 @@
+import json
+import logging
+import zlib
+from typing import Any, Callable
+
+from config.configuration import settings
+
+try:
+    import msgpack
+except ImportError:  # msgpack - необязательная зависимость (CACHE_SERIALIZER=msgpack)
+    msgpack = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # lz4 - необязательная зависимость (CACHE_COMPRESSION=lz4)
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+
+class Codec:
+    """Кодек значений кэша. id записывается в заголовок, поэтому менять id существующих кодеков нельзя"""
+
+    def __init__(self, codec_id: int, name: str, dumps: Callable[[Any], bytes], loads: Callable[[bytes], Any]):
+        self.id = codec_id
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+
+def _json_dumps(value: Any) -> bytes:
+    # Компактный JSON без экранирования кириллицы: вдвое-втрое меньше байт на русский текст
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, use_bin_type=True)
+
+
+def _msgpack_loads(data: bytes) -> Any:
+    if msgpack is None:
+        raise ValueError("Значение кэша записано в msgpack, но пакет msgpack не установлен")
+    return msgpack.unpackb(data, raw=False)
+
+
+def _lz4_compress(data: bytes) -> bytes:
+    return lz4_frame.compress(data)
+
+
+def _lz4_decompress(data: bytes) -> bytes:
+    if lz4_frame is None:
+        raise ValueError("Значение кэша сжато lz4, но пакет lz4 не установлен")
+    return lz4_frame.decompress(data)
+
+
+CODECS: dict[str, Codec] = {
+    "json": Codec(0, "json", _json_dumps, json.loads),
+    "msgpack": Codec(1, "msgpack", _msgpack_dumps, _msgpack_loads),
+}
+
+# Сжатие: имя -> (id, compress, decompress)
+COMPRESSIONS: dict[str, tuple[int, Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "none": (0, bytes, bytes),
+    # Уровень 1: сжатие в разы быстрее уровня по умолчанию при почти том же размере на JSON
+    "zlib": (1, lambda data: zlib.compress(data, 1), zlib.decompress),
+    "lz4": (2, _lz4_compress, _lz4_decompress),
+}
+
+_CODECS_BY_ID = {codec.id: codec for codec in CODECS.values()}
+_DECOMPRESS_BY_ID = {compression_id: decompress for compression_id, _, decompress in COMPRESSIONS.values()}
+
+
+class Serializer:
+    """
+    Сериализация значений, хранимых в Redis.
+
+    Формат: байт версии формата, байт флагов (младшие 4 бита - кодек, старшие - сжатие), данные.
+    Читатель определяет кодек и сжатие по заголовку, а не по настройкам, поэтому настройки можно
+    менять на работающих репликах. Значения без заголовка (JSON, записанный до появления формата)
+    читаются как JSON. Значения меньше compression_threshold байт не сжимаются.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, codec: str = "json", compression: str = "none", compression_threshold: int = 1024):
+        if codec not in CODECS:
+            raise ValueError(f"codec должен быть одним из {list(CODECS)}, получено: {codec}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"compression должен быть одним из {list(COMPRESSIONS)}, получено: {compression}")
+        if codec == "msgpack" and msgpack is None:
+            raise ValueError("Для codec=msgpack требуется пакет msgpack (pip install msgpack)")
+        if compression == "lz4" and lz4_frame is None:
+            raise ValueError("Для compression=lz4 требуется пакет lz4 (pip install lz4)")
+
+        self.codec = CODECS[codec]
+        self.compression = compression
+        self.compression_id, self._compress, _ = COMPRESSIONS[compression]
+        self.compression_threshold = compression_threshold
+
+    def dumps(self, value: Any) -> bytes:
+        data = self.codec.dumps(value)
+        compression_id = 0
+        if self.compression_id and len(data) >= self.compression_threshold:
+            data = self._compress(data)
+            compression_id = self.compression_id
+        return bytes((self.FORMAT_VERSION, self.codec.id | compression_id << 4)) + data
+
+    def loads(self, payload: bytes | str) -> Any:
+        if isinstance(payload, str):
+            payload = payload.encode()
+        if not payload or payload[0] != self.FORMAT_VERSION:
+            # Значение без заголовка - JSON, записанный до появления формата
+            return json.loads(payload)
+
+        flags = payload[1]
+        codec = _CODECS_BY_ID.get(flags & 0x0F)
+        decompress = _DECOMPRESS_BY_ID.get(flags >> 4)
+        if codec is None or decompress is None:
+            raise ValueError(f"Неизвестный формат значения кэша: флаги {flags:#04x}")
+        return codec.loads(decompress(payload[2:]))
+
+
+# Сериализатор для всех значений кэша в Redis
+serializer = Serializer(
+    codec=settings.CACHE_SERIALIZER,
+    compression=settings.CACHE_COMPRESSION,
+    compression_threshold=settings.CACHE_COMPRESSION_THRESHOLD,
+)
@@ -0,0 +1,71 @@
+"""
+Сравнение кодеков и сжатия значений кэша на данных в форме ответов Итилиума.
+
+Запуск из каталога src: python -m utils.serializer_benchmark [количество повторов]
+Для msgpack и lz4 нужны соответствующие пакеты, недоступные варианты пропускаются.
+"""
+import sys
+import timeit
+
+from dto.sc_projection import sc_list_projection
+from utils.serializer import Serializer
+
+
+def make_sc(number: int) -> dict:
+    """Заявка в форме ответа find_sc: HTML-описание, комментарии, доступные действия"""
+    return {
+        "number": f"SC{number:08d}",
+        "shortDescription": "Не работает печать из 1С на сетевой принтер в бухгалтерии",
+        "state": "В работе",
+        "responsibleTeamTitle": "Отдел технической поддержки пользователей",
+        "responsibleEmployeeTitle": "Иванов Иван Иванович",
+        "deadlineDate": "2025-06-18T18:00:00",
+        "registrationDate": "2025-06-16T09:41:27",
+        "description": (
+            "<p>Добрый день!</p><p>При печати документа <b>Реализация товаров и услуг</b> "
+            "принтер HP LaserJet в кабинете 214 выдает ошибку очереди печати. "
+            "Перезагрузка компьютера не помогла.</p>"
+        ) * 4,
+        "comments": [
+            {
+                "author": "Петров Петр Петрович",
+                "date": f"2025-06-16T1{index}:00:00",
+                "text": "Проверили драйвер принтера, переустановили очередь печати, ожидаем обратную связь.",
+            }
+            for index in range(5)
+        ],
+        "change_responsible": True,
+        "send_message_for_search": False,
+        "files": [],
+    }
+
+
+def run(number: int) -> None:
+    scs = [make_sc(index) for index in range(50)]
+    payloads = {
+        "find_sc": scs[0],
+        "list_item": sc_list_projection(scs[0]),
+        "list_50": [sc_list_projection(sc) for sc in scs],
+        "scs_50": scs,
+    }
+
+    variants = []
+    for codec in ("json", "msgpack"):
+        for compression in ("none", "zlib", "lz4"):
+            try:
+                variants.append((f"{codec}+{compression}", Serializer(codec, compression, compression_threshold=1024)))
+            except ValueError as error:
+                print(f"{codec}+{compression}: пропущен ({error})")
+
+    print(f"{'payload':<10} {'variant':<14} {'bytes':>8} {'dumps, мкс':>11} {'loads, мкс':>11}")
+    for payload_name, payload in payloads.items():
+        for variant_name, serializer in variants:
+            data = serializer.dumps(payload)
+            assert serializer.loads(data) == payload
+            dumps_time = timeit.timeit(lambda: serializer.dumps(payload), number=number) / number * 1e6
+            loads_time = timeit.timeit(lambda: serializer.loads(data), number=number) / number * 1e6
+            print(f"{payload_name:<10} {variant_name:<14} {len(data):>8} {dumps_time:>11.1f} {loads_time:>11.1f}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,64 @@
+import asyncio
+import inspect
+import logging
+from functools import wraps
+from typing import Any, Awaitable, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Объединение одновременных вызовов с одинаковым ключом.
+    Первый вызов запускает корутину, остальные ожидают ее результат, не отправляя повторных запросов.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Выполняет func(*args, **kwargs) или присоединяется к уже выполняющемуся вызову с тем же ключом"""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            logger.debug("single-flight: присоединяемся к выполняющемуся вызову %s", key)
+
+        # shield: отмена одного из ожидающих не должна отменять общий запрос для остальных
+        return await asyncio.shield(task)
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Проверяет, выполняется ли сейчас вызов с таким ключом"""
+        return key in self._calls
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Забираем исключение, чтобы не было предупреждения, если все ожидающие были отменены
+        if not task.cancelled():
+            task.exception()
+
+
+# Глобальная группа single-flight для запросов к внешним API
+single_flight_group = SingleFlight()
+
+
+def single_flight(prefix: str | None = None, group: SingleFlight | None = None):
+    """
+    Декоратор, объединяющий одновременные вызовы асинхронной функции с одинаковыми аргументами.
+    Аргументы нормализуются по сигнатуре функции, поэтому f(1) и f(identifier=1) считаются одним вызовом.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        key_prefix = prefix or func.__qualname__
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (key_prefix, repr(sorted(bound.arguments.items())))
+            return await (group or single_flight_group).do(key, func, *args, **kwargs)
+        return wrapper
+    return decorator
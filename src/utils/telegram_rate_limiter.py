@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import time
+from typing import Any, Optional
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Токен-бакет: rate токенов в секунду, не больше capacity накопленных"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def try_acquire(self) -> float:
+        """Забирает токен и возвращает 0, либо возвращает время в секундах до появления токена"""
+        now = time.monotonic()
+        if now < self._updated:
+            # Бакет приостановлен по retry_after
+            return self._updated - now
+
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+        return (1 - self._tokens) / self.rate
+
+    def paused_for(self) -> float:
+        """Сколько секунд осталось до конца паузы"""
+        return max(0.0, self._updated - time.monotonic())
+
+    def pause(self, seconds: float) -> None:
+        """Не выдает токены seconds секунд, после паузы бакет наполняется с нуля"""
+        self._tokens = 0
+        self._updated = max(self._updated, time.monotonic() + seconds)
+
+    def idle_ttl(self) -> float:
+        """Через сколько секунд бездействия бакет будет неотличим от нового: пауза закончится и бакет наполнится"""
+        return self.paused_for() + self.capacity / self.rate
+
+
+class OutgoingRateLimiter(BaseRequestMiddleware):
+    """
+    Ограничение исходящих запросов к Telegram (request middleware сессии бота).
+
+    Отправка сообщений проходит через общий бакет (~30 в секунду на бота) и бакет чата (~1 в секунду),
+    редактирование сообщений в чате - через бакет чата. При нехватке токенов запрос ждет, а не получает 429.
+    Остальные методы (удаление, ответы на callback) не ограничиваются. Если Telegram все же вернул
+    retry_after, чат (или весь бот) приостанавливается на указанное время и запрос повторяется до max_retries раз.
+    """
+
+    # Методы, на которые распространяются лимиты Telegram на отправку сообщений (общий и в чате)
+    SEND_METHOD_PREFIXES = ("send", "forward", "copy")
+    UNLIMITED_METHODS = frozenset({"sendChatAction"})
+    # Методы, которые учитываются в лимите чата
+    EDIT_METHOD_PREFIX = "editMessage"
+
+    def __init__(self, global_rate: float, chat_rate: float, chat_burst: int, max_retries: int):
+        self.global_bucket = TokenBucket(rate=global_rate, capacity=global_rate)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        # Бакеты неактивных чатов вытесняются, когда становятся неотличимы от нового (полного) бакета:
+        # TTL продлевается при каждом обращении и покрывает паузу retry_after
+        self._chat_buckets = LRUCache(max_size=10000)
+        # Метрики для мониторинга
+        self.throttled = 0
+        self.retried = 0
+
+    def _is_send(self, method: TelegramMethod[Any]) -> bool:
+        name = method.__api_method__
+        return name.startswith(self.SEND_METHOD_PREFIXES) and name not in self.UNLIMITED_METHODS
+
+    def _is_edit(self, method: TelegramMethod[Any]) -> bool:
+        return method.__api_method__.startswith(self.EDIT_METHOD_PREFIX)
+
+    def _chat_bucket(self, chat_id: Any) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(rate=self.chat_rate, capacity=self.chat_burst)
+        self._touch_chat_bucket(chat_id, bucket)
+        return bucket
+
+    def _touch_chat_bucket(self, chat_id: Any, bucket: TokenBucket) -> None:
+        self._chat_buckets.set(chat_id, bucket, ttl=bucket.idle_ttl())
+
+    async def _acquire_chat(self, chat_id: Any) -> None:
+        while wait := self._chat_bucket(chat_id).try_acquire():
+            self.throttled += 1
+            await asyncio.sleep(wait)
+
+    async def _acquire_global(self) -> None:
+        while wait := self.global_bucket.try_acquire():
+            self.throttled += 1
+            await asyncio.sleep(wait)
+
+    async def __call__(
+            self,
+            make_request: NextRequestMiddlewareType[TelegramType],
+            bot: Bot,
+            method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id: Optional[Any] = getattr(method, "chat_id", None)
+        limited_global = self._is_send(method)
+        # Инлайн-сообщения (без chat_id) лимитом чата не ограничиваются
+        limited_chat = chat_id is not None and (limited_global or self._is_edit(method))
+
+        for attempt in range(self.max_retries + 1):
+            if limited_chat:
+                await self._acquire_chat(chat_id)
+            if limited_global:
+                await self._acquire_global()
+            if attempt and not (limited_chat or limited_global):
+                # Повтор неограничиваемого метода после retry_after
+                bucket = self._chat_bucket(chat_id) if chat_id is not None else self.global_bucket
+                await asyncio.sleep(bucket.paused_for())
+
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as error:
+                if attempt == self.max_retries:
+                    raise
+                self.retried += 1
+                logger.warning(
+                    f"Telegram: {method.__api_method__} в чате {chat_id} - retry_after {error.retry_after} с, "
+                    f"повтор {attempt + 1}/{self.max_retries}"
+                )
+                if chat_id is not None:
+                    bucket = self._chat_bucket(chat_id)
+                    bucket.pause(error.retry_after)
+                    self._touch_chat_bucket(chat_id, bucket)
+                else:
+                    self.global_bucket.pause(error.retry_after)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Счетчики для мониторинга"""
+        return {
+            "chats": len(self._chat_buckets),
+            "throttled": self.throttled,
+            "retried": self.retried,
+        }
@@ -0,0 +1,60 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ThrottledRenderer:
+    """
+    Перерисовка сообщения по мере поступления данных не чаще, чем раз в min_interval секунд.
+    Запросы на перерисовку, пришедшие в интервале, объединяются в одну перерисовку в конце интервала.
+    """
+
+    def __init__(self, render: Callable[[], Awaitable[None]], min_interval: float):
+        self._render = render
+        self.min_interval = min_interval
+        self._last_render = 0.0
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+
+    def request(self) -> None:
+        """Помечает сообщение устаревшим и запускает перерисовку, если она еще не запланирована"""
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while self._dirty:
+            delay = self._last_render + self.min_interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._dirty = False
+            await self._safe_render()
+
+    async def _safe_render(self) -> None:
+        try:
+            await self._render()
+        except Exception as e:
+            # Ошибка промежуточной перерисовки (например, "message is not modified") не прерывает загрузку
+            logger.warning(f"Не удалось перерисовать сообщение: {e}")
+        finally:
+            self._last_render = time.monotonic()
+
+    async def flush(self, render: Optional[Callable[[], Awaitable[None]]] = None) -> None:
+        """
+        Отменяет запланированную перерисовку и перерисовывает сообщение в финальном виде.
+        render - функция финальной отрисовки, если она отличается от промежуточной
+        """
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._dirty = False
+        delay = self._last_render + self.min_interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await (render or self._render)()
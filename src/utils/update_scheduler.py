@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.dispatcher.middlewares.user_context import UserContextMiddleware
+from aiogram.methods import TelegramMethod
+from aiogram.types import Update
+
+logger = logging.getLogger(__name__)
+
+ProcessUpdate = Callable[..., Awaitable[Any]]
+
+
+class UpdateScheduler:
+    """
+    Планировщик апдейтов: у каждого чата своя очередь, которую обрабатывает отдельная задача.
+    Апдейты одного чата обрабатываются строго по порядку (FSM-сценарии не гоняются), апдейты разных
+    чатов - параллельно и независимо друг от друга: медленный обработчик задерживает только свой чат.
+    Задача чата существует, пока в его очереди есть апдейты.
+
+    max_concurrency ограничивает число одновременно выполняемых обработчиков всех чатов.
+    queue_size ограничивает общее число принятых, но еще не обработанных апдейтов: submit ждет
+    освобождения места, поэтому при перегрузке замедляется получение апдейтов (polling), а не растет
+    число задач в памяти. try_submit не ждет и сообщает о переполнении (webhook отвечает 503,
+    и Telegram повторяет доставку).
+    """
+
+    def __init__(self, max_concurrency: int, queue_size: int):
+        self.max_concurrency = max_concurrency
+        self.queue_size = queue_size
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._chats: dict[int, deque[tuple[float, Bot, Update, dict[str, Any]]]] = {}
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._process: Optional[ProcessUpdate] = None
+        self._pending = 0
+        # Есть место для новых апдейтов / все принятые апдейты обработаны
+        self._has_space = asyncio.Event()
+        self._has_space.set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        # Метрики для мониторинга
+        self.active = 0
+        self.submitted = 0
+        self.processed = 0
+        self.failed = 0
+        self.backpressure_waits = 0
+        self.rejected = 0
+        self.max_depth = 0
+        self.max_wait = 0.0
+
+    @staticmethod
+    def chat_key(update: Update) -> int:
+        """Чат апдейта (если его нет - пользователь, иначе id апдейта)"""
+        context = UserContextMiddleware.resolve_event_context(update)
+        return context.chat_id or context.user_id or update.update_id
+
+    def start(self, process: ProcessUpdate) -> None:
+        """Начинает обработку. process(bot, update, **kwargs) обрабатывает один апдейт"""
+        self._process = process
+        for key in self._chats:
+            self._start_chat(key)
+
+    def _start_chat(self, key: int) -> None:
+        if self._process is not None and key not in self._tasks:
+            self._tasks[key] = asyncio.create_task(self._run_chat(key))
+
+    def _enqueue(self, bot: Bot, update: Update, kwargs: dict[str, Any]) -> None:
+        key = self.chat_key(update)
+        queue = self._chats.setdefault(key, deque())
+        queue.append((time.monotonic(), bot, update, kwargs))
+
+        self._pending += 1
+        self._idle.clear()
+        if self._pending >= self.queue_size:
+            self._has_space.clear()
+        self.submitted += 1
+        self.max_depth = max(self.max_depth, len(queue))
+
+        self._start_chat(key)
+
+    async def submit(self, bot: Bot, update: Update, **kwargs: Any) -> None:
+        """Ставит апдейт в очередь его чата. Если принято queue_size апдейтов, ждет освобождения места"""
+        if self._pending >= self.queue_size:
+            self.backpressure_waits += 1
+            logger.warning(f"Очередь апдейтов заполнена ({self.queue_size}), ожидаем обработки")
+            while self._pending >= self.queue_size:
+                await self._has_space.wait()
+        self._enqueue(bot, update, kwargs)
+
+    def try_submit(self, bot: Bot, update: Update, **kwargs: Any) -> bool:
+        """Ставит апдейт в очередь его чата без ожидания. Возвращает False, если очередь заполнена"""
+        if self._pending >= self.queue_size:
+            self.rejected += 1
+            logger.warning(f"Очередь апдейтов заполнена ({self.queue_size}), апдейт {update.update_id} отклонен")
+            return False
+        self._enqueue(bot, update, kwargs)
+        return True
+
+    async def _run_chat(self, key: int) -> None:
+        queue = self._chats[key]
+        try:
+            while queue:
+                queued_at, bot, update, kwargs = queue.popleft()
+                try:
+                    async with self._semaphore:
+                        self.max_wait = max(self.max_wait, time.monotonic() - queued_at)
+                        self.active += 1
+                        try:
+                            await self._process(bot, update, **kwargs)
+                            self.processed += 1
+                        finally:
+                            self.active -= 1
+                except Exception as e:
+                    self.failed += 1
+                    logger.exception(f"Ошибка обработки апдейта {update.update_id}: {e}")
+                finally:
+                    self._on_done()
+        finally:
+            # Между проверкой пустой очереди и этим блоком нет await: новый апдейт чата запустит новую задачу
+            self._chats.pop(key, None)
+            self._tasks.pop(key, None)
+
+    def _on_done(self) -> None:
+        self._pending -= 1
+        if self._pending < self.queue_size:
+            self._has_space.set()
+        if self._pending == 0:
+            self._idle.set()
+
+    async def stop(self, timeout: float = 10) -> None:
+        """Дожидается обработки принятых апдейтов (не дольше timeout секунд) и останавливает задачи чатов"""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except TimeoutError:
+            logger.warning(f"Не обработано апдейтов при остановке: {self._pending}")
+
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._process = None
+
+    def snapshot(self) -> dict[str, Any]:
+        """Глубина очередей и счетчики для мониторинга"""
+        return {
+            "pending": self._pending,
+            "chats": len(self._chats),
+            "active": self.active,
+            "max_chat_depth": max((len(queue) for queue in self._chats.values()), default=0),
+            "max_depth": self.max_depth,
+            "max_wait": self.max_wait,
+            "submitted": self.submitted,
+            "processed": self.processed,
+            "failed": self.failed,
+            "backpressure_waits": self.backpressure_waits,
+            "rejected": self.rejected,
+        }
+
+
+class ChatOrderedDispatcher(Dispatcher):
+    """
+    Диспетчер, который не обрабатывает апдейт в feed_update, а ставит его в очередь чата UpdateScheduler.
+    Используется с start_polling(handle_as_tasks=False): вместо задачи на каждый апдейт
+    polling ждет только постановки в очередь. Webhook-сервер ставит апдейты через try_feed_update.
+    """
+
+    def __init__(self, *, update_scheduler: UpdateScheduler, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.update_scheduler = update_scheduler
+
+    async def feed_update(self, bot: Bot, update: Update, **kwargs: Any) -> Any:
+        await self.update_scheduler.submit(bot, update, **kwargs)
+        return None
+
+    def try_feed_update(self, bot: Bot, update: Update, **kwargs: Any) -> bool:
+        """Ставит апдейт в очередь без ожидания, False - очередь заполнена"""
+        return self.update_scheduler.try_submit(bot, update, **kwargs)
+
+    async def _process_scheduled_update(self, bot: Bot, update: Update, **kwargs: Any) -> None:
+        response = await super().feed_update(bot, update, **kwargs)
+        if isinstance(response, TelegramMethod):
+            await self.silent_call_request(bot=bot, result=response)
+
+    def start_update_scheduler(self) -> None:
+        self.update_scheduler.start(self._process_scheduled_update)
@@ -0,0 +1,103 @@
+import hmac
+import logging
+from typing import Optional
+
+from aiogram import Bot
+from aiogram.types import Update
+from aiohttp import web
+from pydantic import ValidationError
+
+from utils.update_scheduler import ChatOrderedDispatcher
+
+logger = logging.getLogger(__name__)
+
+SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class WebhookServer:
+    """
+    Прием апдейтов Telegram через webhook на встроенном aiohttp-сервере.
+
+    Запрос проверяется по секретному токену и подтверждается сразу (200) после постановки апдейта
+    в очередь его чата планировщика апдейтов. Если очередь заполнена, сервер отвечает 503,
+    и Telegram повторит доставку позже. Несколько реплик за балансировщиком регистрируют один и тот же URL.
+    """
+
+    def __init__(
+            self,
+            dispatcher: ChatOrderedDispatcher,
+            bot: Bot,
+            url: str,
+            path: str,
+            secret_token: str,
+            host: str,
+            port: int,
+    ):
+        self.dispatcher = dispatcher
+        self.bot = bot
+        self.url = url
+        self.path = path
+        self.secret_token = secret_token
+        self.host = host
+        self.port = port
+        self._runner: Optional[web.AppRunner] = None
+
+    def _is_authorized(self, request: web.Request) -> bool:
+        # Сравниваем байты: compare_digest не принимает строки с не-ASCII символами
+        token = request.headers.get(SECRET_TOKEN_HEADER, "")
+        if hmac.compare_digest(token.encode(), self.secret_token.encode()):
+            return True
+        logger.warning(f"Webhook: запрос с неверным секретным токеном от {request.remote}")
+        return False
+
+    async def _handle_update(self, request: web.Request) -> web.Response:
+        if not self._is_authorized(request):
+            return web.Response(status=401)
+
+        try:
+            update = Update.model_validate(await request.json(), context={"bot": self.bot})
+        except (ValueError, ValidationError):
+            return web.Response(status=400)
+
+        if not self.dispatcher.try_feed_update(self.bot, update, dispatcher=self.dispatcher, bots=[self.bot]):
+            return web.Response(status=503)
+
+        return web.Response()
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        # Метрики внутренние: требуем тот же секретный токен, что и для апдейтов
+        if not self._is_authorized(request):
+            return web.Response(status=401)
+        return web.json_response(self.dispatcher.update_scheduler.snapshot())
+
+    async def start(self) -> None:
+        """Запускает сервер и регистрирует webhook в Telegram"""
+        await self.dispatcher.emit_startup(bot=self.bot, dispatcher=self.dispatcher, bots=[self.bot])
+
+        app = web.Application()
+        app.router.add_post(self.path, self._handle_update)
+        app.router.add_get(f"{self.path}/health", self._handle_health)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+        await self.bot.set_webhook(
+            url=f"{self.url.rstrip('/')}{self.path}",
+            secret_token=self.secret_token,
+            allowed_updates=self.dispatcher.resolve_used_update_types(),
+        )
+        logger.info(f"Webhook: сервер запущен на {self.host}:{self.port}{self.path}")
+
+    async def stop(self, timeout: float = 10) -> None:
+        """
+        Прекращает прием апдейтов и дожидается обработки уже принятых (не дольше timeout секунд).
+        Webhook в Telegram не удаляется: его продолжают обслуживать остальные реплики
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+        await self.dispatcher.update_scheduler.stop(timeout)
+
+        await self.dispatcher.emit_shutdown(bot=self.bot, dispatcher=self.dispatcher, bots=[self.bot])
+        logger.info("Webhook: сервер остановлен")